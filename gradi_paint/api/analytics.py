@@ -0,0 +1,115 @@
+import operator
+from datetime import date
+from functools import reduce
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, FloatField, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Project
+
+# granularity -> (pandas resample rule, period alias, periods per year for year-over-year)
+GRANULARITIES = {
+    'month': ('MS', 'M', 12),
+    'week': ('W-MON', 'W-SUN', 52),  # weeks run Monday to Sunday
+}
+
+# Longest rolling window accepted (two years of weekly periods)
+MAX_WINDOW = 104
+# start/end bounds: pandas timestamps only cover 1677-2262, and `start` also
+# reaches back a year (or the window) for the YoY baseline
+DATE_RANGE = (date(1700, 1, 1), date(2200, 12, 31))
+
+SERIES_COLUMNS = ['revenue', 'cost', 'sqft', 'projects']
+
+COST_COLUMNS = [
+    'body_paint_cost', 'trim_paint_cost', 'other_paint_cost',
+    'supplies_cost', 'additional_service_cost',
+]
+
+
+def _daily_totals(start=None, end=None, status=None):
+    """One GROUP BY end_date query joining Project with Cost; returns a daily DataFrame."""
+    import pandas as pd
+
+    queryset = Project.objects.all()
+    if start:
+        queryset = queryset.filter(end_date__gte=start)
+    if end:
+        queryset = queryset.filter(end_date__lte=end)
+    if status:
+        queryset = queryset.filter(status=status)
+
+    # Projects without a Cost row count as zero cost
+    total_cost = reduce(operator.add, [
+        Coalesce(F(f'cost__{column}'), Value(0.0)) for column in COST_COLUMNS
+    ])
+
+    rows = (
+        queryset.order_by()
+        .values('end_date')
+        .annotate(
+            revenue=Sum('total_gain'),
+            cost=Sum(total_cost, output_field=FloatField()),
+            sqft=Sum('area_size_sqft'),
+            projects=Count('project_id'),
+        )
+        .values_list('end_date', *SERIES_COLUMNS)
+    )
+
+    df = pd.DataFrame.from_records(list(rows), columns=['date'] + SERIES_COLUMNS)
+    df['date'] = pd.to_datetime(df['date'])
+    return df.set_index('date').astype(float)
+
+
+def build_revenue_series(granularity='month', start=None, end=None, window=3, status='completed'):
+    """Revenue, cost, margin and sqft throughput per period, with rolling averages
+    and year-over-year revenue comparison."""
+    # Imported here so loading the URLconf doesn't pull in pandas/NumPy
+    import numpy as np
+    import pandas as pd
+
+    rule, period_alias, periods_per_year = GRANULARITIES[granularity]
+
+    # Pull enough whole periods before `start` for the YoY baseline and rolling window
+    first_period = pd.Period(start, freq=period_alias) if start else None
+    fetch_start = None
+    if first_period is not None:
+        fetch_start = (first_period - max(periods_per_year, window)).start_time.date()
+
+    daily = _daily_totals(fetch_start, end, status)
+    if daily.empty:
+        return []
+
+    series = daily.resample(rule, label='left', closed='left').sum()
+    series['margin'] = series['revenue'] - series['cost']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        series['margin_pct'] = np.where(series['revenue'] != 0, series['margin'] / series['revenue'] * 100, np.nan)
+
+    rolling = series[['revenue', 'cost', 'margin', 'sqft']].rolling(window, min_periods=1).mean()
+    series = series.join(rolling.add_suffix('_rolling'))
+
+    previous = series['revenue'].shift(periods_per_year)
+    series['revenue_prev_year'] = previous
+    with np.errstate(divide='ignore', invalid='ignore'):
+        series['revenue_yoy_pct'] = np.where(previous != 0, (series['revenue'] - previous) / previous * 100, np.nan)
+
+    if first_period is not None:
+        series = series[series.index >= first_period.start_time]
+
+    series = series.round(2)
+    series['projects'] = series['projects'].astype(int)
+    series.index = series.index.date
+    series = series.rename_axis('period').reset_index()
+    return series.astype(object).where(series.notna(), None).to_dict('records')
+
+
+def cached_revenue_series(granularity='month', start=None, end=None, window=3, status='completed'):
+    """build_revenue_series, cached per parameter set for ANALYTICS_CACHE_TIMEOUT seconds."""
+    key = f"project-analytics:{granularity}:{start}:{end}:{window}:{status}"
+    data = cache.get(key)
+    if data is None:
+        data = build_revenue_series(granularity, start, end, window, status)
+        cache.set(key, data, getattr(settings, 'ANALYTICS_CACHE_TIMEOUT', 300))
+    return data
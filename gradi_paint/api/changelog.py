@@ -0,0 +1,128 @@
+"""Append-only change log for Project.status, Cost and ProjectEmployee hours.
+
+Single-object saves are captured by a post_save receiver that diffs against the
+values the instance was loaded with (Model.from_db, see ChangeTrackedModel), so
+reads pay nothing and no extra SELECT is needed. Paths that bypass save()
+record entries themselves: the importer's bulk_create/bulk_update, and deletes.
+
+No delete receivers are connected, since they would make Django give up fast
+(set-based) deletes. Callers log deletes with record_deletes() before deleting,
+which reads the doomed rows and their cascades with one SELECT per tracked
+table, or with record_truncates() for whole-table deletes.
+
+Entries are written on the caller's connection. Wrap writes in
+``transaction.atomic()`` plus ``batched()`` to commit them with the change
+itself and insert them in bulk.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import models
+from django.db.models.signals import post_save
+
+from .models import ChangeLog, Cost, Project, ProjectEmployee
+
+# Model -> tracked fields (attnames, so FK ids are logged rather than objects)
+TRACKED_FIELDS = {
+    Project: ['status'],
+    Cost: ['body_paint_cost', 'trim_paint_cost', 'other_paint_cost', 'supplies_cost', 'additional_service_cost'],
+    ProjectEmployee: ['project_id', 'employee_id', 'hours_worked'],
+}
+
+FLUSH_SIZE = 1000
+
+_local = threading.local()
+
+
+def entry(model, object_id, action, changes):
+    return ChangeLog(model=model._meta.model_name, object_id=object_id, action=action, changes=changes)
+
+
+def record(entries):
+    """Write change-log entries, buffered when inside batched()."""
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None:
+        ChangeLog.objects.bulk_create(entries, batch_size=FLUSH_SIZE)
+        return
+    buffer.extend(entries)
+    if len(buffer) >= FLUSH_SIZE:
+        flush()
+
+
+def flush():
+    buffer = getattr(_local, 'buffer', None)
+    if buffer:
+        ChangeLog.objects.bulk_create(buffer, batch_size=FLUSH_SIZE)
+        buffer.clear()
+
+
+@contextmanager
+def batched():
+    """Buffer entries recorded in the block and bulk insert them on exit.
+
+    Use inside ``transaction.atomic()`` so the entries commit (or roll back)
+    with the changes they describe. Nested use joins the outer batch.
+    """
+    if getattr(_local, 'buffer', None) is not None:
+        yield
+        return
+    _local.buffer = []
+    try:
+        yield
+        flush()
+    finally:
+        _local.buffer = None
+
+
+def record_deletes(queryset):
+    """Log a delete entry for every tracked row the queryset's delete() will remove, cascades included."""
+    record(list(_deletion_entries(queryset)))
+
+
+def _deletion_entries(queryset):
+    model = queryset.model
+    if model in TRACKED_FIELDS:
+        fields = TRACKED_FIELDS[model]
+        for pk, *values in queryset.values_list('pk', *fields).iterator():
+            yield entry(model, pk, 'delete', {field: [value, None] for field, value in zip(fields, values)})
+    for relation in model._meta.related_objects:
+        if relation.on_delete is models.CASCADE:
+            children = relation.related_model._base_manager.filter(
+                **{f'{relation.field.name}__in': queryset.values('pk')}
+            )
+            yield from _deletion_entries(children)
+
+
+def record_truncates(deleted):
+    """Log one entry per tracked table emptied by delete(); `deleted` maps model labels to row counts."""
+    record([
+        entry(model, 0, 'truncate', {'rows': deleted[model._meta.label]})
+        for model in TRACKED_FIELDS
+        if deleted.get(model._meta.label)
+    ])
+
+
+def _tracked_values(instance, fields):
+    # Read __dict__ directly: deferred fields (e.g. from ?fields=) must not trigger a query
+    return {field: instance.__dict__[field] for field in fields if field in instance.__dict__}
+
+
+def _log_save(sender, instance, created, **kwargs):
+    fields = TRACKED_FIELDS[sender]
+    current = _tracked_values(instance, fields)
+    if created:
+        changes = {field: [None, value] for field, value in current.items()}
+    else:
+        previous = getattr(instance, '_loaded_values', {})
+        changes = {
+            field: [previous.get(field), value]
+            for field, value in current.items()
+            if field not in previous or previous[field] != value
+        }
+    instance._loaded_values = {**getattr(instance, '_loaded_values', {}), **current}
+    if changes:
+        record([entry(sender, instance.pk, 'create' if created else 'update', changes)])
+
+
+for tracked_model in TRACKED_FIELDS:
+    post_save.connect(_log_save, sender=tracked_model, dispatch_uid=f'changelog_save_{tracked_model.__name__}')
@@ -0,0 +1,38 @@
+"""Per-bucket project counts for zoomed-out calendar views."""
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import Trunc
+
+# Values accepted by Trunc(); weeks start on Monday
+CALENDAR_GRANULARITIES = ('day', 'week', 'month')
+
+
+def calendar_density(queryset, granularity):
+    """Bucket projects by truncated start_date with counts per status and building type.
+
+    One GROUP BY (bucket, status, building_type) query; the rows are folded into
+    buckets here, so each bucket is built from at most a handful of rows.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(bucket=Trunc('start_date', granularity, output_field=DateField()))
+        .values('bucket', 'status', 'building_type')
+        .annotate(projects=Count('pk'), sqft=Sum('area_size_sqft'))
+        .order_by('bucket')
+    )
+
+    buckets = {}
+    for row in rows:
+        bucket = buckets.setdefault(row['bucket'], {
+            'start': row['bucket'],
+            'count': 0,
+            'area_size_sqft': 0.0,
+            'by_status': {},
+            'by_building_type': {},
+        })
+        bucket['count'] += row['projects']
+        bucket['area_size_sqft'] += row['sqft'] or 0.0
+        bucket['by_status'][row['status']] = bucket['by_status'].get(row['status'], 0) + row['projects']
+        bucket['by_building_type'][row['building_type']] = (
+            bucket['by_building_type'].get(row['building_type'], 0) + row['projects']
+        )
+    return list(buckets.values())
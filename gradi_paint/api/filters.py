@@ -1,6 +1,6 @@
 from django_filters import rest_framework as filters
 from .models import Project
-from django.db import models
+from .normalization import normalize_email, address_key
 
 class ProjectFilter(filters.FilterSet):
     status = filters.ChoiceFilter(choices=Project.JOB_STATUS_CHOICES)
@@ -10,28 +10,25 @@ class ProjectFilter(filters.FilterSet):
         ('Industrial', 'Industrial')
     ])
     job_type = filters.CharFilter(lookup_expr='icontains')
-    address = filters.CharFilter(lookup_expr='icontains')
+    # Exact (normalised) matches on indexed keys; `?search=` (SearchFilter on the view) does substring matching
+    address = filters.CharFilter(method='filter_address')
     start_date = filters.DateFilter()
     end_date = filters.DateFilter()
     min_area = filters.NumberFilter(field_name='area_size_sqft', lookup_expr='gte')
     max_area = filters.NumberFilter(field_name='area_size_sqft', lookup_expr='lte')
-    client_email = filters.CharFilter(field_name='client__email', lookup_expr='icontains')
+    client_email = filters.CharFilter(method='filter_client_email')
     client_name = filters.CharFilter(field_name='client__name', lookup_expr='icontains')
-    search = filters.CharFilter(method='filter_search')
 
-    def filter_search(self, queryset, name, value):
-        return queryset.filter(
-            models.Q(client__name__icontains=value) |
-            models.Q(client__email__icontains=value) |
-            models.Q(address__icontains=value) |
-            models.Q(job_type__icontains=value) |
-            models.Q(description__icontains=value)
-        )
+    def filter_address(self, queryset, name, value):
+        return queryset.filter(address_key=address_key(value))
+
+    def filter_client_email(self, queryset, name, value):
+        return queryset.filter(client__email_normalized=normalize_email(value))
 
     class Meta:
         model = Project
         fields = [
             'status', 'building_type', 'job_type', 'address',
             'start_date', 'end_date', 'min_area', 'max_area',
-            'client_email', 'client_name', 'search'
+            'client_email', 'client_name'
         ] 
\ No newline at end of file
@@ -0,0 +1,821 @@
+"""File import pipeline behind PDFUploadViewSet.
+
+Parsers turn an uploaded file into an iterable of row mappings (header -> cell)
+and are registered per file extension. Heavy third-party libraries are imported
+inside the parser that needs them, so loading the URLconf (every worker,
+management command and test run) doesn't pay for them.
+"""
+import csv
+import hashlib
+import io
+import math
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from itertools import islice
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from . import changelog
+from .models import Client, Project, AdditionalService, Employee, ProjectEmployee, Cost
+from .normalization import normalize_email, address_key
+
+# --------------------------
+#  IMPORT ROW PIPELINE
+# --------------------------
+BUILDING_TYPES = {choice for choice, _ in Project._meta.get_field('building_type').choices}
+
+IMPORT_MODES = ('create', 'upsert')
+UPSERT_CHUNK_SIZE = 1000
+# Per-row results returned by run_import; larger files only report counts past this
+PROCESSED_RECORDS_LIMIT = 1000
+# Rows allowed in each XLSX side sheet ('Costs', 'Crew'), which are indexed in memory
+XLSX_SIDE_SHEET_MAX_ROWS = 100_000
+
+# Columns an upsert rewrites on an existing project (never status)
+PROJECT_DATA_FIELDS = [
+    'building_type', 'address', 'job_type', 'description',
+    'area_size_sqft', 'start_date', 'end_date', 'total_gain',
+]
+PROJECT_UPSERT_FIELDS = ['client', 'address_key'] + PROJECT_DATA_FIELDS
+COST_FIELDS = [
+    'body_paint_cost', 'trim_paint_cost', 'other_paint_cost',
+    'supplies_cost', 'additional_service_cost',
+]
+
+
+class ImportFileError(Exception):
+    """The uploaded file could not be turned into a table of rows."""
+
+
+def is_missing(value):
+    """Empty cell: None or NaN."""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def clean_numeric(value):
+    if is_missing(value):
+        return 0.0
+    # Typed cells (e.g. from XLSX) are used as-is
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    cleaned = ''.join(char for char in str(value) if char.isdigit() or char == '.')
+    try:
+        return float(cleaned)
+    except ValueError:
+        return 0.0
+
+
+# --------------------------
+#  PARSER REGISTRY
+# --------------------------
+PARSERS = {}
+
+
+def register_parser(*extensions):
+    """Register a parser for the given file extensions.
+
+    A parser takes a path or file object and returns an iterable of row
+    mappings keyed by the (stripped) column headers.
+    """
+    def decorator(parser):
+        for extension in extensions:
+            PARSERS[extension.lower()] = parser
+        return parser
+    return decorator
+
+
+def supported_extensions():
+    return sorted(PARSERS)
+
+
+def _open_binary(source):
+    """Binary file object for a path or an uploaded file."""
+    if hasattr(source, 'read'):
+        return source
+    return open(source, 'rb')
+
+
+@register_parser('pdf')
+def parse_pdf(source):
+    import pdfplumber
+
+    try:
+        with pdfplumber.open(source) as pdf:
+            tables = []
+            for page in pdf.pages:
+                extracted_tables = page.extract_tables()
+                if extracted_tables:
+                    tables.extend(extracted_tables)
+    except Exception as pdf_error:
+        raise ImportFileError(f'Error extracting data from PDF: {str(pdf_error)}')
+    if not tables:
+        raise ImportFileError('No tables found in PDF')
+
+    headers = [str(header or '').strip() for header in tables[0][0]]
+    return [dict(zip(headers, row)) for row in tables[0][1:]]
+
+
+@register_parser('csv')
+def parse_csv(source):
+    with io.TextIOWrapper(_open_binary(source), encoding='utf-8-sig', newline='') as text:
+        reader = csv.reader(text)
+        headers = [header.strip() for header in next(reader, [])]
+        for values in reader:
+            if any(values):
+                yield dict(zip(headers, values))
+
+
+@register_parser('xlsx')
+def parse_xlsx(source):
+    """Stream rows from an XLSX workbook using openpyxl's read-only mode.
+
+    A single-sheet workbook is read like a CSV. A multi-sheet workbook uses its
+    'Projects' sheet (one row per job) plus optional 'Costs' and 'Crew' sheets
+    joined on 'Job ID'. Only the cell values of those two side sheets are
+    indexed up front, so each is capped at XLSX_SIDE_SHEET_MAX_ROWS rows (larger
+    workbooks are rejected; split them or import a flat sheet); the projects
+    sheet is streamed row by row. Rows with a blank Job ID are never joined.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError('XLSX import requires openpyxl')
+
+    try:
+        workbook = load_workbook(source, read_only=True, data_only=True)
+    except Exception as xlsx_error:
+        raise ImportFileError(f'Error reading XLSX workbook: {str(xlsx_error)}')
+    return _xlsx_rows(workbook)
+
+
+def _sheet_rows(worksheet):
+    rows = worksheet.iter_rows(values_only=True)
+    headers = [str(header or '').strip() for header in next(rows, ())]
+    for values in rows:
+        if any(value is not None and value != '' for value in values):
+            yield {header: ('' if value is None else value) for header, value in zip(headers, values)}
+
+
+def _job_id(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _side_sheet_rows(worksheet):
+    """(job_id, row) for the rows of a side sheet that name a job, up to XLSX_SIDE_SHEET_MAX_ROWS."""
+    for count, row in enumerate(_sheet_rows(worksheet), start=1):
+        if count > XLSX_SIDE_SHEET_MAX_ROWS:
+            raise ImportFileError(
+                f"Sheet '{worksheet.title}' has more than {XLSX_SIDE_SHEET_MAX_ROWS} rows; "
+                f"split the workbook or import a single flat sheet"
+            )
+        job_id = _job_id(row.get('Job ID', ''))
+        if job_id:
+            yield job_id, row
+
+
+def _xlsx_rows(workbook):
+    try:
+        sheets = {worksheet.title.strip().lower(): worksheet for worksheet in workbook.worksheets}
+        projects = sheets.get('projects', workbook.worksheets[0])
+
+        costs = {}
+        if 'costs' in sheets:
+            for job_id, row in _side_sheet_rows(sheets['costs']):
+                costs.setdefault(job_id, row)
+
+        crew = None
+        if 'crew' in sheets:
+            crew = defaultdict(list)
+            for job_id, row in _side_sheet_rows(sheets['crew']):
+                crew[job_id].append(row)
+
+        for row in _sheet_rows(projects):
+            job_id = _job_id(row.get('Job ID', ''))
+            if job_id in costs:
+                row = {**costs[job_id], **row}
+            if crew is not None:
+                # With a Crew sheet, a job without crew rows has no crew (not the row's own columns)
+                row['_crew'] = crew.get(job_id, [])
+            yield row
+    finally:
+        workbook.close()
+
+
+def read_upload(source, filename):
+    """Parse an uploaded file (path or file object) into an iterable of rows."""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    parser = PARSERS.get(extension)
+    if parser is None:
+        raise ImportFileError(f"File type must be one of: {', '.join(supported_extensions())}")
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return parser(source)
+
+
+def parse_date_cell(value):
+    """A date cell: a date/datetime (typed XLSX cell) or a YYYY-MM-DD string."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), '%Y-%m-%d').date()
+
+
+def split_name(name):
+    """'First Middle Last' -> ('First', 'Middle Last')."""
+    name_parts = name.split()
+    if len(name_parts) >= 2:
+        return name_parts[0], ' '.join(name_parts[1:])
+    return name, ""
+
+
+def normalise_crew(row):
+    """Crew members of a row: the row's own employee columns, or the list a
+    multi-sheet parser attached under '_crew'."""
+    members = row.get('_crew')
+    if members is None:
+        members = [row]
+
+    crew = []
+    for member in members:
+        first_name, last_name = split_name(str(member.get('Employee Name', '')))
+        hours_worked = int(clean_numeric(member.get('Hours Worked', 0)))
+        crew.append({
+            'employee': {
+                'first_name': first_name,
+                'last_name': last_name,
+                'wage': clean_numeric(member.get('Employee Wage', 0)),
+                'hours_worked': hours_worked,
+            },
+            'hours_worked': hours_worked,
+        })
+    return crew
+
+
+def import_key_for(row, email, address, start_date):
+    """Natural key of an import row: the 'Job ID' column when present, else
+    (client email, address, start date). Hashed to fit Project.import_key."""
+    job_id = row.get('Job ID', '')
+    if not is_missing(job_id) and _job_id(job_id):
+        natural_key = f"job|{_job_id(job_id)}"
+    else:
+        natural_key = '|'.join([
+            'row',
+            normalize_email(email),
+            ' '.join(str(address).split()).lower(),
+            start_date.isoformat(),
+        ])
+    return hashlib.sha1(natural_key.encode()).hexdigest()
+
+
+def normalise_row(row):
+    """Parse and validate one spreadsheet row into model field values.
+
+    Runs the same constraints the database/model enforce (email and phone
+    validators, building_type choices, date order) so a bad row fails before
+    anything is written. Raises ValueError with a readable message.
+    """
+    email = row.get('Email', '')
+    email = '' if is_missing(email) else str(email).strip()
+
+    # Clean phone number
+    phone_number = str(row.get('Client Phone', '')).strip()
+    phone_number = ' '.join(phone_number.split())
+
+    building_type = row.get('Building Type', '')
+    start_date = parse_date_cell(row.get('Start Date', ''))
+    end_date = parse_date_cell(row.get('End Date', ''))
+
+    try:
+        Client._meta.get_field('email').run_validators(email)
+        Client._meta.get_field('phone').run_validators(phone_number)
+    except DjangoValidationError as e:
+        raise ValueError('; '.join(dict.fromkeys(e.messages)))
+    if building_type not in BUILDING_TYPES:
+        raise ValueError(f"Invalid building type '{building_type}'")
+    if end_date < start_date:
+        raise ValueError('End Date is before Start Date')
+
+    service_name = row.get('Additional Services', '')
+    address = row.get('Address', '')
+
+    return {
+        'client': {
+            'email': email,
+            'email_normalized': normalize_email(email),
+            'name': email.split('@')[0],
+            'phone': phone_number,
+        },
+        'crew': normalise_crew(row),
+        'project': {
+            'building_type': building_type,
+            'address': address,
+            'job_type': row.get('Job Type', ''),
+            'description': f"Supplies Used: {row.get('Supplies Used', '')}",
+            'area_size_sqft': clean_numeric(row.get('Painting Area Size (sq ft)', 0)),
+            'start_date': start_date,
+            'end_date': end_date,
+            'total_gain': clean_numeric(row.get('Total Gain', 0)),
+            'status': 'pending',
+        },
+        'cost': {
+            'body_paint_cost': clean_numeric(row.get('Total Paint Cost (Body)', 0)),
+            'trim_paint_cost': clean_numeric(row.get('Total Paint Cost (Trim)', 0)),
+            'other_paint_cost': clean_numeric(row.get('Other Paint Cost', 0)),
+            'supplies_cost': clean_numeric(row.get('Cost of Supplies', 0)),
+            'additional_service_cost': clean_numeric(row.get('Additional Service Cost', 0)),
+        },
+        'service': {
+            'service_name': str(service_name),
+            'service_cost': clean_numeric(row.get('Additional Service Cost', 0)),
+        } if not is_missing(service_name) and service_name else None,
+        'date_created': row.get('Date Created', ''),
+        'import_key': import_key_for(row, email, address, start_date),
+    }
+
+
+def normalise_rows(rows, errors):
+    """Yield (index, record) for each valid row; failures are appended to errors."""
+    for index, row in enumerate(rows):
+        try:
+            yield index, normalise_row(row)
+        except Exception as row_error:
+            errors.append({
+                'row': index + 1,
+                'error': str(row_error)
+            })
+
+
+def plan_import(rows, mode='create'):
+    """Dry run: validate every row and report what an import would create or match.
+
+    Existing clients, employees and (in upsert mode) projects are looked up with
+    one set-based query each; nothing is written.
+    """
+    errors = []
+    parsed = list(normalise_rows(rows, errors))
+
+    known_projects = set()
+    if mode == 'upsert':
+        known_projects = set(Project.objects.filter(
+            import_key__in={record['import_key'] for _, record in parsed}
+        ).values_list('import_key', flat=True))
+
+    known_emails = {
+        normalize_email(email)
+        for email in clients_by_email([record['client'] for _, record in parsed]).values_list('email', flat=True)
+    }
+
+    first_names = {member['employee']['first_name'] for _, record in parsed for member in record['crew']}
+    known_employees = set(
+        Employee.objects.filter(first_name__in=first_names).values_list('first_name', 'last_name')
+    )
+
+    summary = {name: {'create': 0, 'match': 0} for name in ('clients', 'employees')}
+    summary.update({name: {'create': 0, 'update': 0} for name in ('projects', 'costs', 'services', 'assignments')})
+    rows = []
+    for index, record in parsed:
+        # Rows later in the file reuse clients/employees created by earlier ones
+        email = record['client']['email']
+        client_action = 'match' if record['client']['email_normalized'] in known_emails else 'create'
+        known_emails.add(record['client']['email_normalized'])
+
+        crew = []
+        for member in record['crew']:
+            employee_key = (member['employee']['first_name'], member['employee']['last_name'])
+            employee_action = 'match' if employee_key in known_employees else 'create'
+            known_employees.add(employee_key)
+            summary['employees'][employee_action] += 1
+            crew.append({
+                'name': ' '.join(employee_key).strip(),
+                'hours_worked': member['hours_worked'],
+                'action': employee_action,
+            })
+
+        # Upserts update the project already imported under the same natural key
+        project_action = 'update' if record['import_key'] in known_projects else 'create'
+        if mode == 'upsert':
+            known_projects.add(record['import_key'])
+
+        summary['clients'][client_action] += 1
+        # Cost, service and crew rows follow their project
+        summary['projects'][project_action] += 1
+        summary['costs'][project_action] += 1
+        summary['assignments'][project_action] += len(crew)
+        if record['service']:
+            summary['services'][project_action] += 1
+
+        rows.append({
+            'row': index + 1,
+            'client': {'email': email, 'action': client_action},
+            'crew': crew,
+            'project': dict(record['project'], action=project_action),
+            'cost': record['cost'],
+            'service': record['service'],
+        })
+
+    return {
+        'dry_run': True,
+        'mode': mode,
+        'total_records': len(parsed) + len(errors),
+        'valid_records': len(parsed),
+        'failed_records': len(errors),
+        'summary': summary,
+        'rows': rows,
+        'errors': errors,
+    }
+
+
+def clients_by_email(client_rows):
+    """Clients matching any of the parsed client rows by normalised email.
+
+    Also matches the exact email, for clients whose email_normalized is still blank
+    (saved by code that bypasses Client.save(), e.g. bulk or raw SQL writes).
+    """
+    return Client.objects.filter(
+        Q(email_normalized__in={client['email_normalized'] for client in client_rows})
+        | Q(email__in={client['email'] for client in client_rows})
+    )
+
+
+def _client_ids(client_rows):
+    """Normalised email -> Client id (oldest match), creating missing clients in one bulk insert."""
+    def lookup(rows):
+        return {
+            normalize_email(email): pk
+            for email, pk in clients_by_email(rows).order_by('-id').values_list('email', 'id')
+        }
+
+    ids = lookup(client_rows)
+    missing = {
+        client['email_normalized']: client for client in client_rows if client['email_normalized'] not in ids
+    }
+    if missing:
+        Client.objects.bulk_create([Client(**client) for client in missing.values()], ignore_conflicts=True)
+        ids.update(lookup(list(missing.values())))
+    return ids
+
+
+def _employee_ids(employee_rows):
+    """(first_name, last_name) -> Employee id (oldest match), creating missing employees in bulk."""
+    def lookup(first_names):
+        rows = (
+            Employee.objects.filter(first_name__in=first_names)
+            .order_by('-id')
+            .values_list('first_name', 'last_name', 'id')
+        )
+        return {(first_name, last_name): pk for first_name, last_name, pk in rows}
+
+    ids = lookup({employee['first_name'] for employee in employee_rows})
+    missing = {}
+    for employee in employee_rows:
+        key = (employee['first_name'], employee['last_name'])
+        if key not in ids:
+            missing[key] = employee
+    if missing:
+        Employee.objects.bulk_create([Employee(**employee) for employee in missing.values()])
+        ids.update(lookup({first_name for first_name, _ in missing}))
+    return ids
+
+
+def upsert_options(unique_fields, update_fields):
+    """bulk_create() arguments for an INSERT that updates rows it collides with.
+
+    MySQL's ON DUPLICATE KEY UPDATE can't name a conflict target (Django raises
+    NotSupportedError if unique_fields is passed); it applies to whichever unique
+    key collides, which for these inserts is only the one in unique_fields.
+    """
+    options = {'update_conflicts': True, 'update_fields': update_fields}
+    if connection.features.supports_update_conflicts_with_target:
+        options['unique_fields'] = unique_fields
+    return options
+
+
+def _result(index, project_id, record, action):
+    """What an import keeps per row: (index, project_id, client_email, date_created, action)."""
+    return index, project_id, record['client']['email'], record['date_created'], action
+
+
+def _upsert_chunk(chunk):
+    """Upsert one chunk of normalised rows; returns a _result() per row, ordered by row."""
+    # The same natural key twice in a chunk: the later row wins
+    by_key = {}
+    superseded = []
+    for index, record in chunk:
+        if record['import_key'] in by_key:
+            superseded.append(by_key[record['import_key']])
+        by_key[record['import_key']] = (index, record)
+
+    client_ids = _client_ids([record['client'] for _, record in by_key.values()])
+    employee_ids = _employee_ids([
+        member['employee'] for _, record in by_key.values() for member in record['crew']
+    ])
+
+    # Current state of every project in the chunk, with its cost, services and crew
+    existing = {
+        row['import_key']: row
+        for row in Project.objects.filter(import_key__in=by_key).values(
+            'import_key', 'project_id', 'client_id', *PROJECT_DATA_FIELDS,
+            *[f'cost__{field}' for field in COST_FIELDS],
+        )
+    }
+    existing_ids = [row['project_id'] for row in existing.values()]
+    # project_id -> [(pk, service_name, service_cost)] / [(pk, employee_id, hours_worked)]
+    services = defaultdict(list)
+    for pk, project_id, service_name, service_cost in AdditionalService.objects.filter(
+        project_id__in=existing_ids
+    ).values_list('id', 'project_id', 'service_name', 'service_cost'):
+        services[project_id].append((pk, service_name, service_cost))
+    assignments = defaultdict(list)
+    for pk, project_id, employee_id, hours_worked in ProjectEmployee.objects.filter(
+        project_id__in=existing_ids
+    ).values_list('id', 'project_id', 'employee_id', 'hours_worked'):
+        assignments[project_id].append((pk, employee_id, hours_worked))
+
+    results = []
+    changed = {}
+    # import_key -> project_id, for rows superseded by a later row with the same key
+    key_project_ids = {}
+    for key, (index, record) in by_key.items():
+        client_id = client_ids[record['client']['email_normalized']]
+        # employee_id -> hours for this row's crew
+        crew_hours = {
+            employee_ids[(member['employee']['first_name'], member['employee']['last_name'])]: member['hours_worked']
+            for member in record['crew']
+        }
+        current = existing.get(key)
+        if current is None:
+            changed[key] = (index, record, client_id, crew_hours, 'created')
+            continue
+
+        project_id = current['project_id']
+        unchanged = (
+            current['client_id'] == client_id
+            and all(current[field] == record['project'][field] for field in PROJECT_DATA_FIELDS)
+            and all(current[f'cost__{field}'] == record['cost'][field] for field in COST_FIELDS)
+            and not any(_reconcile(services[project_id], _wanted_services(record)))
+            and not any(_reconcile(assignments[project_id], crew_hours))
+        )
+        if unchanged:
+            results.append(_result(index, project_id, record, 'unchanged'))
+            key_project_ids[key] = project_id
+        else:
+            changed[key] = (index, record, client_id, crew_hours, 'updated')
+
+    if not changed:
+        return sorted(results + _superseded_results(superseded, key_project_ids))
+
+    # One INSERT ... ON CONFLICT/ON DUPLICATE KEY UPDATE for the changed projects.
+    # status is only set on insert, so re-imports never reset workflow progress.
+    Project.objects.bulk_create(
+        [
+            Project(
+                import_key=key, client_id=client_id,
+                address_key=address_key(record['project']['address']), **record['project']
+            )
+            for key, (_, record, client_id, _, _) in changed.items()
+        ],
+        **upsert_options(['import_key'], PROJECT_UPSERT_FIELDS),
+    )
+    project_ids = dict(Project.objects.filter(import_key__in=changed).values_list('import_key', 'project_id'))
+
+    Cost.objects.bulk_create(
+        [Cost(project_id=project_ids[key], **record['cost']) for key, (_, record, _, _, _) in changed.items()],
+        **upsert_options(['project'], COST_FIELDS),
+    )
+
+    # bulk_create/bulk_update skip the change-log signals, so log from what we fetched above
+    log_entries = []
+    new_services, updated_services, stale_services = [], [], []
+    new_assignments, updated_assignments, stale_assignments = [], [], []
+    for key, (index, record, _, crew_hours, action) in changed.items():
+        project_id = project_ids[key]
+        current = existing.get(key)
+        if current is None:
+            log_entries.append(changelog.entry(Project, project_id, 'create', {
+                'status': [None, record['project']['status']]
+            }))
+
+        if current is None or current['cost__body_paint_cost'] is None:
+            log_entries.append(changelog.entry(Cost, project_id, 'create', {
+                field: [None, value] for field, value in record['cost'].items()
+            }))
+        else:
+            cost_changes = {
+                field: [current[f'cost__{field}'], value]
+                for field, value in record['cost'].items()
+                if current[f'cost__{field}'] != value
+            }
+            if cost_changes:
+                log_entries.append(changelog.entry(Cost, project_id, 'update', cost_changes))
+
+        # The row is the source of truth for the project's service and crew: rows it no
+        # longer lists are deleted (new projects have none, so they only get inserts)
+        to_create, to_update, to_delete = _reconcile(services[project_id], _wanted_services(record))
+        new_services.extend(
+            AdditionalService(project_id=project_id, service_name=service_name, service_cost=service_cost)
+            for service_name, service_cost in to_create
+        )
+        updated_services.extend(
+            AdditionalService(pk=pk, service_cost=service_cost) for pk, _, _, service_cost in to_update
+        )
+        stale_services.extend(pk for pk, _, _ in to_delete)
+
+        to_create, to_update, to_delete = _reconcile(assignments[project_id], crew_hours)
+        new_assignments.extend(
+            ProjectEmployee(project_id=project_id, employee_id=employee_id, hours_worked=hours_worked)
+            for employee_id, hours_worked in to_create
+        )
+        for pk, _, old_hours, hours_worked in to_update:
+            updated_assignments.append(ProjectEmployee(pk=pk, hours_worked=hours_worked))
+            log_entries.append(changelog.entry(ProjectEmployee, pk, 'update', {
+                'hours_worked': [old_hours, hours_worked]
+            }))
+        for pk, employee_id, hours_worked in to_delete:
+            stale_assignments.append(pk)
+            log_entries.append(changelog.entry(ProjectEmployee, pk, 'delete', {
+                'project_id': [project_id, None],
+                'employee_id': [employee_id, None],
+                'hours_worked': [hours_worked, None],
+            }))
+
+        results.append(_result(index, project_id, record, action))
+        key_project_ids[key] = project_id
+
+    AdditionalService.objects.filter(pk__in=stale_services).delete()
+    AdditionalService.objects.bulk_create(new_services)
+    AdditionalService.objects.bulk_update(updated_services, ['service_cost'])
+    ProjectEmployee.objects.filter(pk__in=stale_assignments).delete()
+    ProjectEmployee.objects.bulk_create(new_assignments)
+    ProjectEmployee.objects.bulk_update(updated_assignments, ['hours_worked'])
+
+    if new_assignments:
+        # Not every backend returns ids from bulk_create; read them back in one query
+        new_pairs = {(assignment.project_id, assignment.employee_id) for assignment in new_assignments}
+        known_ids = {pk for rows in assignments.values() for pk, _, _ in rows}
+        for pk, project_id, employee_id, hours_worked in ProjectEmployee.objects.filter(
+            project_id__in={project_id for project_id, _ in new_pairs}
+        ).values_list('id', 'project_id', 'employee_id', 'hours_worked'):
+            if (project_id, employee_id) in new_pairs and pk not in known_ids:
+                log_entries.append(changelog.entry(ProjectEmployee, pk, 'create', {
+                    'project_id': [None, project_id],
+                    'employee_id': [None, employee_id],
+                    'hours_worked': [None, hours_worked],
+                }))
+
+    changelog.record(log_entries)
+    return sorted(results + _superseded_results(superseded, key_project_ids))
+
+
+def _wanted_services(record):
+    service = record['service']
+    return {service['service_name']: service['service_cost']} if service else {}
+
+
+def _reconcile(current_rows, wanted):
+    """Match a project's child rows [(pk, key, value)] against the wanted {key: value}.
+
+    Returns (to_create [(key, value)], to_update [(pk, key, old, new)], to_delete [(pk, key, value)]);
+    rows whose key is no longer wanted, or that repeat an already matched key, are deleted.
+    """
+    matched = {}
+    to_delete = []
+    for pk, key, value in current_rows:
+        if key in wanted and key not in matched:
+            matched[key] = (pk, value)
+        else:
+            to_delete.append((pk, key, value))
+    to_create = [(key, value) for key, value in wanted.items() if key not in matched]
+    to_update = [
+        (matched[key][0], key, matched[key][1], value)
+        for key, value in wanted.items()
+        if key in matched and matched[key][1] != value
+    ]
+    return to_create, to_update, to_delete
+
+
+def _superseded_results(superseded, key_project_ids):
+    """Report rows overridden by a later row with the same natural key against that row's project."""
+    return [
+        _result(index, key_project_ids[record['import_key']], record, 'duplicate') for index, record in superseded
+    ]
+
+
+def upsert_records(records, errors, chunk_size=UPSERT_CHUNK_SIZE):
+    """Idempotent import of normalised rows keyed on Project.import_key.
+
+    New rows are inserted and changed rows are updated in place, together with
+    their Cost, AdditionalService and ProjectEmployee rows; services and crew the
+    row no longer lists are deleted. Unchanged rows are left alone. Records are
+    consumed chunk by chunk, each in its own transaction; yields a _result() per
+    imported row and appends failures to errors.
+    """
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        try:
+            with transaction.atomic(), changelog.batched():
+                chunk_results = _upsert_chunk(chunk)
+        except Exception as chunk_error:
+            errors.extend({'row': index + 1, 'error': str(chunk_error)} for index, _ in chunk)
+            continue
+        yield from chunk_results
+
+
+def create_records(records, errors):
+    """Original import mode: a new Project (with Cost, service and crew) per row.
+
+    Each project is stamped with the row's import_key unless another project
+    already holds it, so a later ?mode=upsert of the same data updates these
+    projects rather than duplicating them. Projects created before import keys
+    existed have none: make the first upsert sync against a fresh load.
+
+    Yields a _result() per imported row; failures are appended to errors.
+    """
+    for index, record in records:
+        try:
+            # One transaction per row: a failing row leaves nothing behind, and its
+            # change-log entries are inserted together with it
+            with transaction.atomic(), changelog.batched():
+                # Create or get Client (matched case- and whitespace-insensitively)
+                client_data = record['client']
+                client = clients_by_email([client_data]).order_by('id').first()
+                if client is None:
+                    client = Client.objects.create(
+                        email=client_data['email'],
+                        name=client_data['name'],
+                        phone=client_data['phone']
+                    )
+
+                # Create Project; repeated rows still create projects, only the first owns the key
+                import_key = record['import_key']
+                if Project.objects.filter(import_key=import_key).exists():
+                    import_key = None
+                project = Project.objects.create(client=client, import_key=import_key, **record['project'])
+
+                # Create Cost
+                Cost.objects.create(project=project, **record['cost'])
+
+                # Create Additional Service
+                if record['service']:
+                    AdditionalService.objects.create(project=project, **record['service'])
+
+                for member in record['crew']:
+                    # Create or get Employee
+                    employee_data = member['employee']
+                    employee, created = Employee.objects.get_or_create(
+                        first_name=employee_data['first_name'],
+                        last_name=employee_data['last_name'],
+                        defaults={
+                            'wage': employee_data['wage'],
+                            'hours_worked': employee_data['hours_worked']
+                        }
+                    )
+
+                    # Create Project Employee Relationship
+                    ProjectEmployee.objects.create(
+                        project=project,
+                        employee=employee,
+                        hours_worked=member['hours_worked']
+                    )
+
+        except Exception as row_error:
+            errors.append({
+                'row': index + 1,
+                'error': str(row_error)
+            })
+            continue
+        yield _result(index, project.project_id, record, 'created')
+
+
+def run_import(rows, mode='create'):
+    """Normalise and import parsed rows.
+
+    Returns (processed_records, counts, errors): the first PROCESSED_RECORDS_LIMIT
+    rows' results, a Counter of rows per action, and the failed rows, all ordered
+    by row. Nothing per row is kept beyond that, so memory stays flat for big files.
+    """
+    errors = []
+    records = normalise_rows(rows, errors)
+    write_records = upsert_records if mode == 'upsert' else create_records
+
+    processed_records = []
+    counts = Counter()
+    # Results arrive in row order (chunks are consumed in order and sorted internally)
+    for index, project_id, client_email, date_created, action in write_records(records, errors):
+        counts[action] += 1
+        if len(processed_records) < PROCESSED_RECORDS_LIMIT:
+            processed_records.append({
+                'project_id': project_id,
+                'client_email': client_email,
+                'date_created': date_created,
+                'action': action
+            })
+    errors.sort(key=lambda error: error['row'])
+    return processed_records, counts, errors
@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, Count, Min, Value, When
+
+from api.models import Client, Project
+from api.normalization import normalize_email, address_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill Client.email_normalized and Project.address_key in batches, "
+        "optionally merging clients whose emails only differ by case/whitespace."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per UPDATE batch.")
+        parser.add_argument('--merge-duplicates', action='store_true',
+                            help="Move projects of duplicate clients onto the oldest client and delete the rest.")
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+
+        updated = self.backfill(Client, 'email', 'email_normalized', normalize_email, batch_size)
+        self.stdout.write(f"Clients updated: {updated}")
+        updated = self.backfill(Project, 'address', 'address_key', address_key, batch_size)
+        self.stdout.write(f"Projects updated: {updated}")
+
+        if options['merge_duplicates']:
+            merged = self.merge_duplicate_clients(batch_size)
+            self.stdout.write(f"Duplicate clients merged: {merged}")
+
+        self.stdout.write(self.style.SUCCESS("Lookup keys are up to date."))
+
+    def backfill(self, model, source_field, key_field, make_key, batch_size):
+        """Walk the table in primary-key order and bulk_update rows whose key is stale."""
+        updated = 0
+        last_pk = None
+        while True:
+            queryset = model.objects.order_by('pk')
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            rows = list(queryset.values_list('pk', source_field, key_field)[:batch_size])
+            if not rows:
+                return updated
+
+            stale = [
+                model(pk=pk, **{key_field: make_key(source)})
+                for pk, source, current in rows
+                if make_key(source) != current
+            ]
+            if stale:
+                with transaction.atomic():
+                    model.objects.bulk_update(stale, [key_field], batch_size=batch_size)
+                updated += len(stale)
+            last_pk = rows[-1][0]
+
+    def merge_duplicate_clients(self, batch_size):
+        """Keep the oldest client per normalised email; repoint projects with one UPDATE per batch."""
+        groups = list(
+            Client.objects.values('email_normalized')
+            .annotate(clients=Count('id'), keep_id=Min('id'))
+            .filter(clients__gt=1)
+            .values_list('email_normalized', 'keep_id')
+        )
+
+        merged = 0
+        for offset in range(0, len(groups), batch_size):
+            keepers = dict(groups[offset:offset + batch_size])
+            duplicates = {
+                pk: keepers[email]
+                for pk, email in Client.objects.filter(email_normalized__in=keepers).values_list('id', 'email_normalized')
+                if pk != keepers[email]
+            }
+            with transaction.atomic():
+                Project.objects.filter(client_id__in=duplicates).update(client_id=Case(
+                    *[When(client_id=duplicate_id, then=Value(keep_id)) for duplicate_id, keep_id in duplicates.items()]
+                ))
+                Client.objects.filter(id__in=duplicates).delete()
+            merged += len(duplicates)
+        return merged
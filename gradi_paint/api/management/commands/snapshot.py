@@ -0,0 +1,193 @@
+import json
+import os
+import tarfile
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.migrations.recorder import MigrationRecorder
+
+from api.models import AdditionalService, Client, Cost, Employee, Project, ProjectEmployee
+
+# Parent tables first, so the restore order is valid even where constraints can't be deferred
+SNAPSHOT_MODELS = [Client, Employee, Project, Cost, AdditionalService, ProjectEmployee]
+
+MANIFEST = 'manifest.json'
+SNAPSHOT_FORMAT = 1
+
+
+def arrow_type(pa, field):
+    """Parquet column type for a concrete model field (FKs are stored as their id column)."""
+    internal_type = field.target_field.get_internal_type() if field.is_relation else field.get_internal_type()
+    if internal_type in ('AutoField', 'BigAutoField', 'IntegerField', 'BigIntegerField',
+                         'SmallIntegerField', 'PositiveIntegerField'):
+        return pa.int64()
+    if internal_type == 'FloatField':
+        return pa.float64()
+    if internal_type == 'DateField':
+        return pa.date32()
+    if internal_type == 'DateTimeField':
+        return pa.timestamp('us', tz='UTC')
+    if internal_type == 'BooleanField':
+        return pa.bool_()
+    return pa.string()
+
+
+def table_schema(pa, model):
+    return pa.schema([
+        pa.field(field.attname, arrow_type(pa, field), nullable=field.null or field.primary_key)
+        for field in model._meta.concrete_fields
+    ])
+
+
+def schema_migration():
+    last = MigrationRecorder.Migration.objects.filter(app='api').order_by('-id').values_list('name', flat=True).first()
+    return last or ''
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the Client, Project, Cost, AdditionalService, Employee and ProjectEmployee tables to a "
+        "snapshot archive (one compressed Parquet file per table), or restore such an archive."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['export', 'restore'])
+        parser.add_argument('path', help="Snapshot archive (.tar) to write or read.")
+        parser.add_argument('--batch-size', type=int, default=10000, help="Rows per SELECT / INSERT batch.")
+        parser.add_argument('--compression', default='zstd', help="Parquet codec for export (zstd, snappy, gzip, none).")
+        parser.add_argument('--replace', action='store_true',
+                            help="On restore, empty the snapshot tables first instead of requiring them to be empty.")
+
+    def handle(self, *args, **options):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise CommandError("Snapshots require pyarrow (pip install pyarrow).")
+
+        batch_size = max(options['batch_size'], 1)
+        started = time.perf_counter()
+        if options['action'] == 'export':
+            counts = self.export(options['path'], batch_size, options['compression'])
+        else:
+            counts = self.restore(options['path'], batch_size, options['replace'])
+
+        for model in SNAPSHOT_MODELS:
+            self.stdout.write(f"{model.__name__}: {counts[model._meta.label]}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot {options['action']} finished in {time.perf_counter() - started:.1f}s."
+        ))
+
+    def export(self, path, batch_size, compression):
+        """Stream each table in primary-key order into its own Parquet file and bundle them in a tar."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        counts = {}
+        # One transaction, so every table is read from the same snapshot and the archive
+        # is consistent even while the app keeps writing
+        with transaction.atomic(), tempfile.TemporaryDirectory() as workdir, tarfile.open(path, 'w') as archive:
+            if connection.vendor in ('mysql', 'postgresql'):
+                # Both run at READ COMMITTED under Django (a fresh snapshot per statement);
+                # this must come before the transaction's first query
+                with connection.cursor() as cursor:
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+            for model in SNAPSHOT_MODELS:
+                schema = table_schema(pa, model)
+                filename = f'{model._meta.model_name}.parquet'
+                local_path = os.path.join(workdir, filename)
+                rows = 0
+                with pq.ParquetWriter(local_path, schema, compression=compression) as writer:
+                    for batch in self.iter_batches(model, schema.names, batch_size):
+                        columns = list(zip(*batch))
+                        writer.write_batch(pa.RecordBatch.from_arrays(
+                            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                            schema=schema,
+                        ))
+                        rows += len(batch)
+                archive.add(local_path, arcname=filename)
+                os.remove(local_path)
+                counts[model._meta.label] = rows
+
+            manifest_path = os.path.join(workdir, MANIFEST)
+            with open(manifest_path, 'w') as manifest:
+                json.dump({'format': SNAPSHOT_FORMAT, 'migration': schema_migration(), 'tables': counts}, manifest, indent=2)
+            archive.add(manifest_path, arcname=MANIFEST)
+        return counts
+
+    def iter_batches(self, model, columns, batch_size):
+        """Keyset pagination on the primary key: constant memory on every backend, including
+        MySQL, where QuerySet.iterator() still buffers the whole result client-side."""
+        pk_name = model._meta.pk.attname
+        last_pk = None
+        while True:
+            queryset = model.objects.order_by('pk')
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            batch = list(queryset.values_list(*columns)[:batch_size])
+            if not batch:
+                return
+            yield batch
+            last_pk = batch[-1][columns.index(pk_name)]
+
+    def restore(self, path, batch_size, replace):
+        """Bulk insert every table with FK checks off, then validate them once, as loaddata does."""
+        import pyarrow.parquet as pq
+
+        if not os.path.exists(path):
+            raise CommandError(f"Snapshot {path} does not exist.")
+
+        with tarfile.open(path, 'r') as archive:
+            manifest = self.read_manifest(archive)
+            if manifest['migration'] != schema_migration():
+                self.stderr.write(self.style.WARNING(
+                    f"Snapshot was taken at migration {manifest['migration'] or '(none)'}, "
+                    f"this database is at {schema_migration() or '(none)'}."
+                ))
+
+            tables = [model._meta.db_table for model in SNAPSHOT_MODELS]
+            counts = {}
+            with transaction.atomic():
+                if replace:
+                    connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables, allow_cascade=True))
+                else:
+                    occupied = [model.__name__ for model in SNAPSHOT_MODELS if model.objects.exists()]
+                    if occupied:
+                        raise CommandError(f"Tables are not empty ({', '.join(occupied)}); use --replace to overwrite them.")
+
+                with connection.constraint_checks_disabled():
+                    for model in SNAPSHOT_MODELS:
+                        parquet = pq.ParquetFile(self.member(archive, f'{model._meta.model_name}.parquet'))
+                        expected = [field.attname for field in model._meta.concrete_fields]
+                        if sorted(parquet.schema_arrow.names) != sorted(expected):
+                            raise CommandError(
+                                f"{model.__name__} columns in the snapshot do not match this schema; "
+                                f"migrate to {manifest['migration']} before restoring."
+                            )
+                        rows = 0
+                        for batch in parquet.iter_batches(batch_size=batch_size):
+                            model.objects.bulk_create([model(**row) for row in batch.to_pylist()], batch_size=batch_size)
+                            rows += batch.num_rows
+                        counts[model._meta.label] = rows
+
+                connection.check_constraints(table_names=tables)
+                sequence_sql = connection.ops.sequence_reset_sql(no_style(), SNAPSHOT_MODELS)
+                if sequence_sql:
+                    with connection.cursor() as cursor:
+                        for sql in sequence_sql:
+                            cursor.execute(sql)
+        return counts
+
+    def read_manifest(self, archive):
+        manifest = json.load(self.member(archive, MANIFEST))
+        if manifest.get('format') != SNAPSHOT_FORMAT:
+            raise CommandError(f"Unsupported snapshot format {manifest.get('format')!r}.")
+        return manifest
+
+    def member(self, archive, name):
+        try:
+            return archive.extractfile(name)
+        except KeyError:
+            raise CommandError(f"Snapshot is missing {name}.")
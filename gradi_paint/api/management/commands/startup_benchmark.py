@@ -0,0 +1,68 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter: time and peak RSS of importing the WSGI app and
+# loading the URLconf (what a worker does before its first request), and which
+# heavy libraries that pulled in.
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import gradi_paint.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    rss_kb //= 1024
+print(json.dumps({
+    'seconds': elapsed,
+    'rss_kb': rss_kb,
+    'loaded': sorted(name for name in %r if name in sys.modules),
+}))
+"""
+
+HEAVY_MODULES = ['pandas', 'numpy', 'pdfplumber', 'openpyxl', 'pyarrow']
+
+
+class Command(BaseCommand):
+    help = "Measure cold-start import time and peak RSS of gradi_paint.wsgi in fresh interpreters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Number of fresh interpreters to sample.")
+        parser.add_argument('--json', action='store_true', help="Print the result as JSON.")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+
+        samples = []
+        for _ in range(max(options['runs'], 1)):
+            output = subprocess.run(
+                [sys.executable, '-c', PROBE % (HEAVY_MODULES,)],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+
+        result = {
+            'runs': len(samples),
+            'import_seconds_median': statistics.median(sample['seconds'] for sample in samples),
+            'import_seconds_min': min(sample['seconds'] for sample in samples),
+            'peak_rss_mb': max(sample['rss_kb'] for sample in samples) / 1024,
+            'heavy_modules_loaded': samples[-1]['loaded'],
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(result))
+            return
+
+        self.stdout.write(f"gradi_paint.wsgi cold start over {result['runs']} run(s)")
+        self.stdout.write(f"  import time: median {result['import_seconds_median'] * 1000:.0f} ms, "
+                          f"min {result['import_seconds_min'] * 1000:.0f} ms")
+        self.stdout.write(f"  peak RSS:    {result['peak_rss_mb']:.1f} MB")
+        self.stdout.write(f"  heavy modules loaded: {', '.join(result['heavy_modules_loaded']) or 'none'}")
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['start_date', 'end_date'], name='project_dates_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectemployee',
+            index=models.Index(fields=['employee', 'project'], name='projectemployee_emp_proj_idx'),
+        ),
+    ]
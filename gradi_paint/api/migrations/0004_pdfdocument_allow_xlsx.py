@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:53
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_project_import_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pdfdocument',
+            name='file',
+            field=models.FileField(upload_to='pdfs/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'csv', 'xlsx'])]),
+        ),
+    ]
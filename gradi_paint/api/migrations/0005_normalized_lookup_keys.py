@@ -0,0 +1,49 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:56
+
+from django.db import migrations, models
+
+from api.normalization import address_key, normalize_email
+
+BACKFILL_BATCH_SIZE = 2000
+
+
+def backfill_model(model, source_field, key_field, make_key):
+    """Fill key_field from source_field in primary-key ordered batches (see backfill_lookup_keys)."""
+    last_pk = None
+    while True:
+        queryset = model.objects.order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        rows = list(queryset.values_list('pk', source_field)[:BACKFILL_BATCH_SIZE])
+        if not rows:
+            return
+        model.objects.bulk_update(
+            [model(pk=pk, **{key_field: make_key(source)}) for pk, source in rows], [key_field],
+        )
+        last_pk = rows[-1][0]
+
+
+def backfill_lookup_keys(apps, schema_editor):
+    backfill_model(apps.get_model('api', 'Client'), 'email', 'email_normalized', normalize_email)
+    backfill_model(apps.get_model('api', 'Project'), 'address', 'address_key', address_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_pdfdocument_allow_xlsx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='email_normalized',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='address_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=40),
+        ),
+        migrations.RunPython(backfill_lookup_keys, migrations.RunPython.noop),
+    ]
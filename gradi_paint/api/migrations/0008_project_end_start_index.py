@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_changelog_truncate_action'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='project',
+            name='project_dates_idx',
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['end_date', 'start_date'], name='project_end_start_idx'),
+        ),
+    ]
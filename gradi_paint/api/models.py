@@ -1,14 +1,36 @@
 from django.db import models
 from django.core.validators import RegexValidator, EmailValidator, FileExtensionValidator
+from .normalization import normalize_email, address_key
+
+class ChangeTrackedModel(models.Model):
+    """Remembers the column values an instance was loaded with, for diffing in api.changelog."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    class Meta:
+        abstract = True
 
 #  Clients Table
 class Client(models.Model):
     name = models.CharField(max_length=255)
     email = models.EmailField(unique=True, validators=[EmailValidator()])
     phone = models.CharField(max_length=50, validators=[RegexValidator(regex=r'^\+?[\d\-x\.()]+$', message="Invalid phone number")])
+    # Trimmed, lower-cased email for case-insensitive lookups and dedup
+    email_normalized = models.CharField(max_length=254, db_index=True, editable=False, default='')
+
+    def save(self, *args, **kwargs):
+        self.email_normalized = normalize_email(self.email)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'email' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'email_normalized'}
+        super().save(*args, **kwargs)
 
 #  Projects Table (with auto-incrementing Job ID)
-class Project(models.Model):
+class Project(ChangeTrackedModel):
     JOB_STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('in_progress', 'In Progress'),
@@ -26,9 +48,28 @@ class Project(models.Model):
     end_date = models.DateField()
     total_gain = models.FloatField()
     status = models.CharField(max_length=20, choices=JOB_STATUS_CHOICES, default='pending')
+    # Natural key of the spreadsheet row this project was imported from (see upsert imports)
+    import_key = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+    # Hash of the canonicalised address (see api.normalization) for indexed lookups
+    address_key = models.CharField(max_length=40, db_index=True, editable=False, default='')
+
+    def save(self, *args, **kwargs):
+        self.address_key = address_key(self.address)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'address' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'address_key'}
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            # Interval-overlap lookups (calendar, crew availability). end_date leads: in
+            # `start_date <= end AND end_date >= start` only the leading column is range-scanned,
+            # and for current/future windows `end_date >= start` is the selective side
+            models.Index(fields=['end_date', 'start_date'], name='project_end_start_idx'),
+        ]
 
 # Cost tables
-class Cost(models.Model):
+class Cost(ChangeTrackedModel):
     project = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True)
     body_paint_cost = models.FloatField(default=0.0)
     trim_paint_cost = models.FloatField(default=0.0)
@@ -54,14 +95,19 @@ class Employee(models.Model):
     hours_worked = models.IntegerField()
 
 # Employee table
-class ProjectEmployee(models.Model):
+class ProjectEmployee(ChangeTrackedModel):
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
     hours_worked = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee', 'project'], name='projectemployee_emp_proj_idx'),
+        ]
+
 class PDFDocument(models.Model):
     file = models.FileField(upload_to='pdfs/', validators=[
-        FileExtensionValidator(allowed_extensions=['pdf', 'csv'])
+        FileExtensionValidator(allowed_extensions=['pdf', 'csv', 'xlsx'])
     ])
     uploaded_at = models.DateTimeField(auto_now_add=True)
     processed = models.BooleanField(default=False)
@@ -71,4 +117,24 @@ class PDFDocument(models.Model):
 
     class Meta:
         ordering = ['-uploaded_at']
-    
\ No newline at end of file
+    
+# Append-only change log (see api.changelog), read through the `changes` feed
+class ChangeLog(models.Model):
+    ACTION_CHOICES = [
+        ('create', 'Create'),
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+        ('truncate', 'Truncate')
+    ]
+
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changes = models.JSONField(default=dict)  # {field: [old, new]}; truncate entries: {'rows': count}
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['model', 'id'], name='changelog_model_id_idx'),
+        ]
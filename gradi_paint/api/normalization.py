@@ -0,0 +1,31 @@
+import hashlib
+import re
+
+# Common street-address spellings folded to one form (USPS-style abbreviations)
+ADDRESS_ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'av': 'ave', 'road': 'rd', 'drive': 'dr',
+    'boulevard': 'blvd', 'lane': 'ln', 'court': 'ct', 'place': 'pl',
+    'terrace': 'ter', 'highway': 'hwy', 'parkway': 'pkwy', 'circle': 'cir',
+    'square': 'sq', 'apartment': 'apt', 'suite': 'ste', 'unit': 'unit',
+    'building': 'bldg', 'floor': 'fl',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+}
+
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+def normalize_email(email):
+    """Lookup form of an email address: trimmed and lower-cased."""
+    return (email or '').strip().lower()
+
+
+def canonical_address(address):
+    """Lower-case, punctuation-free, abbreviation-folded form of a free-text address."""
+    words = _NON_WORD.sub(' ', (address or '').lower()).split()
+    return ' '.join(ADDRESS_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def address_key(address):
+    """Fixed-width hash of canonical_address, used as an indexed equality key."""
+    return hashlib.sha1(canonical_address(address).encode()).hexdigest()
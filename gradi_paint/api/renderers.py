@@ -0,0 +1,31 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+
+# --------------------------
+#  FAST JSON RENDERER
+# --------------------------
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson when it is installed.
+
+    Output is the same compact JSON DRF produces by default. Requests that ask
+    for indented output, or environments without orjson, use the stock
+    renderer.
+    """
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Reuse DRF's encoder for the types orjson doesn't know (Decimal, lazy strings, ...)
+        return orjson.dumps(data, default=JSONEncoder().default, option=self.options)
@@ -0,0 +1,80 @@
+from itertools import groupby
+
+from .models import ProjectEmployee
+
+
+# --------------------------
+#  CREW SCHEDULING HELPERS
+# --------------------------
+def overlapping_assignments(start, end):
+    """ProjectEmployee rows whose project overlaps [start, end] (inclusive dates)."""
+    return ProjectEmployee.objects.filter(
+        project__start_date__lte=end,
+        project__end_date__gte=start,
+    )
+
+
+def find_conflicts(employee_id, start, end, exclude_project_id=None, exclude_assignment_id=None):
+    """Return the ids of other projects the employee is booked on between start and end."""
+    queryset = overlapping_assignments(start, end).filter(employee_id=employee_id)
+    if exclude_project_id is not None:
+        queryset = queryset.exclude(project_id=exclude_project_id)
+    if exclude_assignment_id is not None:
+        queryset = queryset.exclude(pk=exclude_assignment_id)
+    return sorted(set(queryset.values_list('project_id', flat=True)))
+
+
+def employee_availability(start, end, employee_ids=None):
+    """Busy intervals, assignments and double bookings per employee for a date range.
+
+    Everything comes from one indexed interval-overlap query; the per-employee
+    sweep below is linear in the number of assignments once they are sorted.
+    """
+    queryset = overlapping_assignments(start, end)
+    if employee_ids:
+        queryset = queryset.filter(employee_id__in=employee_ids)
+
+    rows = queryset.order_by('employee_id', 'project__start_date', 'project__end_date').values_list(
+        'employee_id', 'employee__first_name', 'employee__last_name',
+        'project_id', 'project__start_date', 'project__end_date',
+    )
+
+    results = []
+    for employee_id, employee_rows in groupby(rows, key=lambda row: row[0]):
+        employee_rows = list(employee_rows)
+        _, first_name, last_name = employee_rows[0][:3]
+
+        assignments = []
+        busy = []
+        conflicts = []
+        active = []  # (end_date, project_id) of assignments still open at the current start
+
+        for _, _, _, project_id, project_start, project_end in employee_rows:
+            assignments.append({'project_id': project_id, 'start': project_start, 'end': project_end})
+
+            # Merge into busy intervals (rows are sorted by start date)
+            if busy and project_start <= busy[-1]['end']:
+                busy[-1]['end'] = max(busy[-1]['end'], project_end)
+            else:
+                busy.append({'start': project_start, 'end': project_end})
+
+            # Every still-open assignment on a different project is a double booking
+            active = [item for item in active if item[0] >= project_start]
+            for other_end, other_project_id in active:
+                if other_project_id != project_id:
+                    conflicts.append({
+                        'project_ids': [other_project_id, project_id],
+                        'start': project_start,
+                        'end': min(other_end, project_end),
+                    })
+            active.append((project_end, project_id))
+
+        results.append({
+            'employee_id': employee_id,
+            'name': f"{first_name} {last_name}".strip(),
+            'busy': busy,
+            'assignments': assignments,
+            'conflicts': conflicts,
+        })
+
+    return results
@@ -1,37 +1,46 @@
 from rest_framework import serializers
-from .models import Client, Project, AdditionalService, Employee, ProjectEmployee, Cost, PDFDocument
+from .models import Client, Project, AdditionalService, Employee, ProjectEmployee, Cost, PDFDocument, ChangeLog
+
+#  Sparse fieldsets: keep only the fields listed in the 'fields' context entry
+class SparseFieldsSerializerMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested:
+            for field_name in set(self.fields) - set(requested):
+                self.fields.pop(field_name)
 
 #  Client Serializer (with validation)
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Client
-        fields = '__all__'
+        exclude = ['email_normalized']  # internal lookup key
 
 #  Project Serializer (Auto-increment Job ID)
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Project
-        fields = '__all__'
+        exclude = ['address_key']  # internal lookup key
 
 #  Additional Service Serializer
-class AdditionalServiceSerializer(serializers.ModelSerializer):
+class AdditionalServiceSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = AdditionalService
         fields = '__all__'
 
 # Employee Serializer (with first & last name)
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = '__all__'
 
 #  Project-Employee Relationship Serializer
-class ProjectEmployeeSerializer(serializers.ModelSerializer):
+class ProjectEmployeeSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ProjectEmployee
         fields = '__all__'
 
-class CostSerializer(serializers.ModelSerializer):
+class CostSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     total_cost = serializers.ReadOnlyField()  # Read-only field to get total cost
 
     class Meta:
@@ -43,6 +52,11 @@ class PDFDocumentSerializer(serializers.ModelSerializer):
         model = PDFDocument
         fields = ['id', 'file', 'uploaded_at', 'processed']
 
+class ChangeLogSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChangeLog
+        fields = ['id', 'model', 'object_id', 'action', 'changes', 'created_at']
+
 class CalendarEventSerializer(serializers.ModelSerializer):
     title = serializers.SerializerMethodField()
     start = serializers.DateField(source='start_date')
@@ -1,3 +1,582 @@
-from django.test import TestCase
+import csv
+import importlib
+import io
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from .ingestion import PROJECT_UPSERT_FIELDS, upsert_options
+from .throttling import ActionScopedRateThrottle, acquire_slot, release_slot
+from .models import Client, Project, AdditionalService, Employee, ProjectEmployee, Cost, PDFDocument, ChangeLog
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+IMPORT_COLUMNS = [
+    'Job ID', 'Email', 'Client Phone', 'Building Type', 'Address', 'Job Type', 'Start Date', 'End Date',
+    'Total Gain', 'Painting Area Size (sq ft)', 'Cost of Supplies', 'Additional Services',
+    'Additional Service Cost', 'Employee Name', 'Employee Wage', 'Hours Worked',
+]
+
+
+def import_row(job_id, **overrides):
+    row = {
+        'Job ID': job_id,
+        'Email': 'jane@example.com',
+        'Client Phone': '555-0100',
+        'Building Type': 'Residential',
+        'Address': f'{job_id} Oak Ave',
+        'Job Type': 'Interior',
+        'Start Date': '2025-03-01',
+        'End Date': '2025-03-04',
+        'Total Gain': 1200,
+        'Painting Area Size (sq ft)': 800,
+        'Cost of Supplies': 150,
+        'Additional Services': 'Gutters',
+        'Additional Service Cost': 90,
+        'Employee Name': 'Tom Hill',
+        'Employee Wage': 25,
+        'Hours Worked': 8,
+    }
+    row.update(overrides)
+    return row
+
+
+def csv_upload(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=IMPORT_COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return SimpleUploadedFile('import.csv', buffer.getvalue().encode(), content_type='text/csv')
+
+
+def xlsx_upload(sheets):
+    """Workbook with one sheet per {title: [header, *rows]} entry."""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        worksheet = workbook.create_sheet(title)
+        for row in rows:
+            worksheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return SimpleUploadedFile(
+        'import.xlsx', buffer.getvalue(),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+def make_project(client, **overrides):
+    fields = {
+        'building_type': 'Residential',
+        'address': '1 Elm St',
+        'job_type': 'Interior',
+        'area_size_sqft': 500,
+        'start_date': date(2025, 3, 1),
+        'end_date': date(2025, 3, 4),
+        'total_gain': 1000,
+    }
+    fields.update(overrides)
+    return Project.objects.create(client=client, **fields)
+
+
+class CacheResetMixin:
+    def setUp(self):
+        # Throttle counters and concurrency slots live in the cache
+        cache.clear()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImportTestCase(CacheResetMixin, APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, rows, upload=csv_upload, **params):
+        query = '&'.join(f'{key}={value}' for key, value in params.items())
+        return self.client.post(f'/api/pdf-upload/?{query}', {'file': upload(rows)}, format='multipart')
+
+
+class UpsertImportTests(ImportTestCase):
+    def test_upsert_is_idempotent(self):
+        rows = [import_row(101), import_row(102)]
+        first = self.upload(rows, mode='upsert')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(first.data['created'], 2)
+        Project.objects.update(status='in_progress')
+
+        second = self.upload(rows, mode='upsert')
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual((second.data['created'], second.data['updated'], second.data['unchanged']), (0, 0, 2))
+        self.assertEqual(Project.objects.count(), 2)
+        self.assertEqual(Cost.objects.count(), 2)
+        self.assertEqual(AdditionalService.objects.count(), 2)
+        self.assertEqual(ProjectEmployee.objects.count(), 2)
+        # status is workflow state, never reset by a re-import
+        self.assertFalse(Project.objects.exclude(status='in_progress').exists())
+
+    def test_upsert_replaces_changed_crew_and_services(self):
+        self.upload([import_row(101)], mode='upsert')
+        project = Project.objects.get()
+        tom = ProjectEmployee.objects.get(project=project)
+
+        response = self.upload([import_row(101, **{'Employee Name': 'Sam Roe', 'Additional Services': 'Fence'})],
+                               mode='upsert')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(
+            list(ProjectEmployee.objects.filter(project=project).values_list('employee__first_name', flat=True)),
+            ['Sam'],
+        )
+        self.assertEqual(list(project.services.values_list('service_name', flat=True)), ['Fence'])
+        self.assertTrue(ChangeLog.objects.filter(model='projectemployee', object_id=tom.pk, action='delete').exists())
+
+    def test_upsert_removes_rows_added_outside_the_import(self):
+        self.upload([import_row(101)], mode='upsert')
+        project = Project.objects.get()
+        extra = Employee.objects.create(first_name='Ann', last_name='Lee', wage=20, hours_worked=0)
+        ProjectEmployee.objects.create(project=project, employee=extra, hours_worked=3)
+
+        response = self.upload([import_row(101)], mode='upsert')
+        self.assertEqual((response.data['updated'], response.data['unchanged']), (1, 0))
+        self.assertFalse(ProjectEmployee.objects.filter(employee=extra).exists())
+
+    def test_upsert_adopts_projects_from_create_mode(self):
+        self.upload([import_row(101)])
+        self.assertEqual(self.upload([import_row(101)]).status_code, 201)
+        self.assertEqual(Project.objects.count(), 2)
+        self.assertEqual(Project.objects.filter(import_key__isnull=False).count(), 1)
+
+        response = self.upload([import_row(101)], mode='upsert')
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(Project.objects.count(), 2)
+
+    def test_upsert_options_without_conflict_target(self):
+        # MySQL: ON DUPLICATE KEY UPDATE takes no conflict target, so unique_fields must be left out
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            options = upsert_options(['import_key'], PROJECT_UPSERT_FIELDS)
+            self.assertNotIn('unique_fields', options)
+            # the validation bulk_create() runs before any SQL, which raises NotSupportedError on MySQL
+            Project.objects.all()._check_bulk_create_options(
+                False, options['update_conflicts'],
+                [Project._meta.get_field(name) for name in options['update_fields']], options.get('unique_fields'),
+            )
+        self.assertEqual(upsert_options(['import_key'], PROJECT_UPSERT_FIELDS)['unique_fields'], ['import_key'])
+
+
+class DryRunImportTests(ImportTestCase):
+    def test_dry_run_writes_nothing(self):
+        for mode in ('create', 'upsert'):
+            with self.subTest(mode=mode):
+                response = self.upload([import_row(101), import_row(102, Email='not-an-email')],
+                                       mode=mode, dry_run='1')
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.data['dry_run'])
+                self.assertEqual((response.data['valid_records'], response.data['failed_records']), (1, 1))
+
+        for model in (Client, Project, Cost, AdditionalService, Employee, ProjectEmployee, PDFDocument, ChangeLog):
+            self.assertFalse(model.objects.exists(), model.__name__)
+
+
+PROJECT_SHEET_COLUMNS = IMPORT_COLUMNS[:10]
+
+
+def project_sheet_row(job_id, **overrides):
+    row = import_row(job_id, **overrides)
+    return [row[column] for column in PROJECT_SHEET_COLUMNS]
+
+
+class XlsxImportTests(ImportTestCase):
+    def workbook(self):
+        return {
+            'Projects': [
+                PROJECT_SHEET_COLUMNS,
+                project_sheet_row(101),
+                project_sheet_row(102),
+                project_sheet_row('', Address='7 Birch Rd'),
+            ],
+            'Costs': [
+                ['Job ID', 'Cost of Supplies'],
+                [101, 75],
+                ['', 999],
+            ],
+            'Crew': [
+                ['Job ID', 'Employee Name', 'Employee Wage', 'Hours Worked'],
+                [101, 'Tom Hill', 25, 8],
+                [101, 'Sam Roe', 20, 6],
+                ['', 'Ann Lee', 30, 4],
+            ],
+        }
+
+    def test_sheets_are_joined_on_job_id(self):
+        response = self.upload(self.workbook(), upload=xlsx_upload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['successful_records'], 3)
+
+        job_101 = Project.objects.get(address='101 Oak Ave')
+        self.assertEqual(job_101.cost.supplies_cost, 75)
+        self.assertEqual(
+            sorted(job_101.projectemployee_set.values_list('employee__first_name', 'hours_worked')),
+            [('Sam', 6), ('Tom', 8)],
+        )
+        # Jobs without crew rows (or without a Job ID) get no crew, and blank-ID side rows join nothing
+        self.assertFalse(ProjectEmployee.objects.exclude(project=job_101).exists())
+        self.assertEqual(sorted(Employee.objects.values_list('first_name', flat=True)), ['Sam', 'Tom'])
+        self.assertFalse(Cost.objects.filter(supplies_cost=999).exists())
+
+    def test_oversized_side_sheet_is_rejected(self):
+        with mock.patch('api.ingestion.XLSX_SIDE_SHEET_MAX_ROWS', 2):
+            response = self.upload(self.workbook(), upload=xlsx_upload)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("'Crew' has more than 2 rows", response.data['error'])
+        self.assertFalse(Project.objects.exists())
+
+
+class ThrottlingTests(ImportTestCase):
+    def test_rate_limited_scope_answers_429(self):
+        rates = dict(ActionScopedRateThrottle.THROTTLE_RATES, summary='2/min')
+        with mock.patch.object(ActionScopedRateThrottle, 'THROTTLE_RATES', rates):
+            for _ in range(2):
+                self.assertEqual(self.client.get('/api/projects/summary/').status_code, 200)
+            response = self.client.get('/api/projects/summary/')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        # Actions without a scope are not throttled
+        self.assertEqual(self.client.get('/api/projects/').status_code, 200)
+
+    @override_settings(API_CONCURRENCY_LIMITS={'imports': 1}, API_CONCURRENCY_RETRY_AFTER=7)
+    def test_busy_scope_answers_429_until_a_slot_frees(self):
+        slot = acquire_slot('imports', 1)
+        response = self.upload([import_row(101)])
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '7')
+
+        release_slot(*slot)
+        self.assertEqual(self.upload([import_row(101)]).status_code, 201)
+        # The request gave its slot back
+        self.assertIsNotNone(acquire_slot('imports', 1))
+
+    def test_expired_slot_is_not_released_by_its_old_holder(self):
+        key, token = acquire_slot('imports', 1)
+        cache.delete(key)  # lease ran out
+        new_holder = acquire_slot('imports', 1)
+
+        release_slot(key, token)
+        self.assertEqual(cache.get(key), new_holder[1])
+        self.assertIsNone(acquire_slot('imports', 1))
+
+
+class LookupKeyTests(ImportTestCase):
+    def test_clients_are_matched_on_normalised_email(self):
+        client = Client.objects.create(name='Jane', email='Jane@Example.com', phone='555-0100')
+        for mode, job_id in (('create', 101), ('upsert', 102)):
+            with self.subTest(mode=mode):
+                response = self.upload([import_row(job_id, Email='  JANE@example.COM ')], mode=mode)
+                self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(Client.objects.count(), 1)
+        self.assertEqual(Project.objects.filter(client=client).count(), 2)
+
+    def test_clients_without_lookup_key_match_on_exact_email(self):
+        # bulk_create() skips Client.save(), leaving email_normalized blank, like rows from before migration 0005
+        Client.objects.bulk_create([Client(name='Jane', email='jane@example.com', phone='555-0100')])
+        for mode, job_id in (('create', 101), ('upsert', 102)):
+            with self.subTest(mode=mode):
+                response = self.upload([import_row(job_id)], mode=mode)
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual(response.data['failed_records'], 0)
+
+        self.assertEqual(Client.objects.count(), 1)
+        self.assertEqual(Project.objects.count(), 2)
+
+    def test_migration_backfills_lookup_keys(self):
+        Client.objects.bulk_create([Client(name='Jane', email=' Jane@Example.com', phone='555-0100')])
+        make_project(Client.objects.get(), address='12 North Oak Avenue')
+        Project.objects.update(address_key='')
+
+        migration = importlib.import_module('api.migrations.0005_normalized_lookup_keys')
+        migration.backfill_lookup_keys(apps, None)
+        self.assertEqual(Client.objects.get().email_normalized, 'jane@example.com')
+        self.assertEqual(self.client.get('/api/projects/', {'address': '12 n oak ave'}).data[0]['address'],
+                         '12 North Oak Avenue')
+
+    def test_lookup_filters_use_normalised_keys(self):
+        client = Client.objects.create(name='Jane', email='Jane@Example.com', phone='555-0100')
+        make_project(client, address='12 North Oak Avenue')
+
+        response = self.client.get('/api/projects/', {'client_email': ' jane@example.com'})
+        self.assertEqual(len(response.data), 1)
+        response = self.client.get('/api/projects/', {'address': '12 n oak ave'})
+        self.assertEqual(len(response.data), 1)
+
+
+class ProjectFilterTests(CacheResetMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        client = Client.objects.create(name='Jane', email='jane@example.com', phone='555-0100')
+        make_project(client, address='12 Oak Ave')
+        make_project(client, address='3 Pine Rd')
+
+    def test_search_matches_each_term(self):
+        response = self.client.get('/api/projects/', {'search': 'Ave Oak'})
+        self.assertEqual([project['address'] for project in response.data], ['12 Oak Ave'])
+
+    def test_invalid_filter_values_are_rejected(self):
+        self.assertEqual(self.client.get('/api/projects/', {'status': 'bogus'}).status_code, 400)
+
+
+class AnalyticsTests(CacheResetMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        client = Client.objects.create(name='Jane', email='jane@example.com', phone='555-0100')
+        for end_date, total_gain in ((date(2024, 1, 20), 800), (date(2025, 1, 15), 1000), (date(2025, 2, 10), 500)):
+            project = make_project(client, status='completed', end_date=end_date, total_gain=total_gain)
+            Cost.objects.create(project=project, supplies_cost=100)
+        make_project(client, end_date=date(2025, 2, 11), total_gain=9000)
+
+    def test_monthly_series(self):
+        response = self.client.get('/api/projects/analytics/', {'start': '2025-01-01', 'window': 2})
+        self.assertEqual(response.status_code, 200)
+        january, february = response.data['series']
+        self.assertEqual(january['period'], date(2025, 1, 1))
+        self.assertEqual((january['revenue'], january['cost'], january['margin']), (1000, 100, 900))
+        self.assertEqual((january['revenue_prev_year'], january['revenue_yoy_pct']), (800, 25))
+        # The pending project is left out unless ?status=all
+        self.assertEqual((february['revenue'], february['revenue_rolling'], february['projects']), (500, 750, 1))
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in (
+            {'granularity': 'year'},
+            {'start': '2025-13-01'},
+            {'window': 0},
+            {'window': 'x'},
+            {'window': 100000},
+            {'start': '0001-01-01'},
+            {'end': '9999-12-31'},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/projects/analytics/', params).status_code, 400)
+
+
+class CalendarDensityTests(CacheResetMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        client = Client.objects.create(name='Jane', email='jane@example.com', phone='555-0100')
+        for start_date, building_type, project_status in (
+            (date(2025, 3, 3), 'Residential', 'pending'),
+            (date(2025, 3, 5), 'Commercial', 'completed'),
+            (date(2025, 3, 20), 'Residential', 'completed'),
+            (date(2025, 4, 2), 'Residential', 'pending'),
+        ):
+            make_project(client, start_date=start_date, end_date=start_date, building_type=building_type,
+                         status=project_status, area_size_sqft=100)
+
+    def calendar(self, **params):
+        return self.client.get('/api/projects/calendar_events/', params)
+
+    def test_monthly_buckets(self):
+        response = self.calendar(granularity='month', start='2025-03-01', end='2025-04-30')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 4)
+        march, april = response.data['buckets']
+        self.assertEqual((march['start'], march['count'], march['area_size_sqft']), (date(2025, 3, 1), 3, 300))
+        self.assertEqual(march['by_status'], {'pending': 1, 'completed': 2})
+        self.assertEqual(march['by_building_type'], {'Residential': 2, 'Commercial': 1})
+        self.assertEqual((april['start'], april['count']), (date(2025, 4, 1), 1))
+        self.assertEqual(len(response.data['events']), 4)
+
+    def test_weekly_buckets_respect_filters(self):
+        response = self.calendar(granularity='week', status='completed')
+        self.assertEqual([(bucket['start'], bucket['count']) for bucket in response.data['buckets']],
+                         [(date(2025, 3, 3), 1), (date(2025, 3, 17), 1)])
+
+    @override_settings(CALENDAR_EVENTS_THRESHOLD=3)
+    def test_events_are_left_out_above_the_threshold(self):
+        response = self.calendar(granularity='day')
+        self.assertEqual((response.data['total'], response.data['events']), (4, None))
+        self.assertEqual(len(self.calendar(granularity='day', end='2025-03-31').data['events']), 3)
+
+    def test_invalid_parameters_are_rejected(self):
+        self.assertEqual(self.calendar(granularity='year').status_code, 400)
+        self.assertEqual(self.calendar(granularity='day', start='March').status_code, 400)
+        # Without granularity the plain event list is unchanged
+        self.assertEqual(len(self.calendar().data), 4)
+
+
+class SchedulingTests(CacheResetMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        client = Client.objects.create(name='Jane', email='jane@example.com', phone='555-0100')
+        self.first = make_project(client, start_date=date(2025, 3, 1), end_date=date(2025, 3, 4))
+        self.overlapping = make_project(client, start_date=date(2025, 3, 3), end_date=date(2025, 3, 6))
+        self.later = make_project(client, start_date=date(2025, 3, 10), end_date=date(2025, 3, 12))
+        self.employee = Employee.objects.create(first_name='Tom', last_name='Hill', wage=25, hours_worked=0)
+        self.assignment = ProjectEmployee.objects.create(project=self.first, employee=self.employee, hours_worked=8)
+
+    def assign(self, project):
+        return self.client.post('/api/project-employees/', {
+            'project': project.pk, 'employee': self.employee.pk, 'hours_worked': 4,
+        }, format='json')
+
+    def test_double_booking_is_rejected(self):
+        with mock.patch.object(Employee.objects, 'select_for_update',
+                               wraps=Employee.objects.select_for_update) as lock:
+            response = self.assign(self.overlapping)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(self.first.pk), response.data['employee'][0])
+        lock.assert_called_once_with()
+
+        self.assertEqual(self.assign(self.later).status_code, 201)
+        response = self.client.patch(f'/api/project-employees/{self.assignment.pk}/', {'hours_worked': 9}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_availability_merges_busy_time_and_reports_conflicts(self):
+        ProjectEmployee.objects.create(project=self.overlapping, employee=self.employee, hours_worked=4)
+
+        response = self.client.get('/api/employees/availability/', {'start': '2025-03-01', 'end': '2025-03-31'})
+        self.assertEqual(response.status_code, 200)
+        [tom] = response.data['employees']
+        self.assertEqual(tom['name'], 'Tom Hill')
+        self.assertEqual(tom['busy'], [{'start': date(2025, 3, 1), 'end': date(2025, 3, 6)}])
+        self.assertEqual(tom['conflicts'], [{
+            'project_ids': [self.first.pk, self.overlapping.pk], 'start': date(2025, 3, 3), 'end': date(2025, 3, 4),
+        }])
+
+        self.assertEqual(self.client.get('/api/employees/availability/', {'start': '2025-03-01'}).status_code, 400)
+        response = self.client.get('/api/employees/availability/', {'start': '2025-03-05', 'end': '2025-03-01'})
+        self.assertEqual(response.status_code, 400)
+
+
+class SnapshotTests(CacheResetMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        client = Client.objects.create(name='Jane', email='jane@example.com', phone='555-0100')
+        project = make_project(client, status='completed', description='Two coats')
+        Cost.objects.create(project=project, supplies_cost=12.5)
+        AdditionalService.objects.create(project=project, service_name='Gutters', service_cost=90)
+        employee = Employee.objects.create(first_name='Tom', last_name='Hill', wage=25, hours_worked=0)
+        ProjectEmployee.objects.create(project=project, employee=employee, hours_worked=8)
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+        self.path = f'{self.workdir}/snapshot.tar'
+
+    def table_rows(self):
+        return {
+            model.__name__: list(model.objects.order_by('pk').values())
+            for model in (Client, Project, Cost, AdditionalService, Employee, ProjectEmployee)
+        }
+
+    def test_export_and_restore_round_trip(self):
+        before = self.table_rows()
+        call_command('snapshot', 'export', self.path, stdout=io.StringIO())
+
+        Project.objects.update(status='pending')
+        Employee.objects.all().delete()
+        Client.objects.create(name='Sam', email='sam@example.com', phone='555-0101')
+        with self.assertRaisesMessage(CommandError, 'not empty'):
+            call_command('snapshot', 'restore', self.path, stdout=io.StringIO())
+
+        call_command('snapshot', 'restore', self.path, '--replace', stdout=io.StringIO())
+        self.assertEqual(self.table_rows(), before)
+        # Sequences continue past the restored ids
+        make_project(Client.objects.get(), address='2 Elm St')
+
+
+@override_settings(CHANGES_SETTLE_SECONDS=0)
+class ChangeLogTests(CacheResetMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client_record = Client.objects.create(name='Jane', email='jane@example.com', phone='555-0100')
+        self.project = make_project(self.client_record)
+        Cost.objects.create(project=self.project, supplies_cost=10)
+        employee = Employee.objects.create(first_name='Tom', last_name='Hill', wage=25, hours_worked=0)
+        ProjectEmployee.objects.create(project=self.project, employee=employee, hours_worked=8)
+
+    def test_changes_feed_pages_by_id(self):
+        for project_status in ('in_progress', 'completed'):
+            response = self.client.patch(f'/api/projects/{self.project.pk}/', {'status': project_status}, format='json')
+            self.assertEqual(response.status_code, 200)
+
+        seen = []
+        after = 0
+        while True:
+            page = self.client.get('/api/changes/', {'after': after, 'limit': 2}).data
+            self.assertLessEqual(len(page['results']), 2)
+            seen.extend(entry['id'] for entry in page['results'])
+            if not page['has_more']:
+                break
+            after = page['next_after']
+
+        self.assertEqual(seen, list(ChangeLog.objects.values_list('id', flat=True)))
+        self.assertEqual(
+            [entry['changes'] for entry in self.client.get('/api/changes/', {'model': 'project'}).data['results']],
+            [{'status': [None, 'pending']}, {'status': ['pending', 'in_progress']},
+             {'status': ['in_progress', 'completed']}],
+        )
+        self.assertEqual(self.client.get('/api/changes/', {'after': 'x'}).status_code, 400)
+
+    @override_settings(CHANGES_SETTLE_SECONDS=60)
+    def test_recent_entries_wait_for_the_settle_window(self):
+        settled = ChangeLog.objects.order_by('id')[:2]
+        ChangeLog.objects.filter(id__in=[entry.id for entry in settled]).update(
+            created_at=ChangeLog.objects.earliest('id').created_at - timedelta(minutes=5),
+        )
+
+        page = self.client.get('/api/changes/', {'limit': 10}).data
+        self.assertEqual([entry['id'] for entry in page['results']], [entry.id for entry in settled])
+        self.assertEqual(page['next_after'], settled[1].id)
+        self.assertFalse(page['has_more'])
+
+    def test_destroy_logs_cascaded_rows(self):
+        last_id = ChangeLog.objects.latest('id').id
+        response = self.client.delete(f'/api/projects/{self.project.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            sorted(ChangeLog.objects.filter(id__gt=last_id).values_list('model', 'action')),
+            [('cost', 'delete'), ('project', 'delete'), ('projectemployee', 'delete')],
+        )
+
+    def test_clear_all_logs_one_entry_per_table(self):
+        make_project(self.client_record, address='2 Elm St')
+        last_id = ChangeLog.objects.latest('id').id
+
+        response = self.client.delete('/api/data-management/clear_all_data/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(ChangeLog.objects.filter(id__gt=last_id).values_list('model', 'action', 'changes')),
+            [('cost', 'truncate', {'rows': 1}), ('project', 'truncate', {'rows': 2}),
+             ('projectemployee', 'truncate', {'rows': 1})],
+        )
+
+
+class SparseFieldsTests(CacheResetMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        client = Client.objects.create(name='Jane', email='jane@example.com', phone='555-0100')
+        make_project(client)
+
+    def test_fields_trim_the_response(self):
+        response = self.client.get('/api/projects/', {'fields': 'project_id,status'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data[0]), {'project_id', 'status'})
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/projects/', {'fields': 'status,bogus'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('bogus', response.data['fields'])
+
+    def test_fields_are_ignored_outside_list_and_retrieve(self):
+        project = Project.objects.get()
+        response = self.client.patch(f'/api/projects/{project.pk}/?fields=status', {'job_type': 'Exterior'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('job_type', response.data)
@@ -0,0 +1,85 @@
+"""Per-action rate limits and in-flight concurrency caps.
+
+Views opt in by mapping actions to scopes, e.g. ``throttle_scopes = {'create': 'imports'}``,
+or by defining ``get_throttle_scope()`` when the scope depends on the request.
+A scope is rate limited by REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] and, if it
+appears in API_CONCURRENCY_LIMITS, also capped on requests in flight. Both
+answer 429 with Retry-After.
+
+State lives in the default cache, so limits are per process with the local-memory
+cache and global once a shared cache (Redis, Memcached) is configured.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import ScopedRateThrottle, SimpleRateThrottle
+
+
+def action_scope(view):
+    if hasattr(view, 'get_throttle_scope'):
+        return view.get_throttle_scope()
+    return getattr(view, 'throttle_scopes', {}).get(getattr(view, 'action', None))
+
+
+class ActionScopedRateThrottle(ScopedRateThrottle):
+    """ScopedRateThrottle keyed on the view's action through `throttle_scopes`."""
+
+    def allow_request(self, request, view):
+        self.scope = action_scope(view)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return SimpleRateThrottle.allow_request(self, request, view)
+
+
+def acquire_slot(scope, limit):
+    """Claim one of `limit` cache slots for `scope`; returns (key, token) or None when all are taken.
+
+    cache.add is atomic, and the lease timeout frees slots held by a worker that died mid-request.
+    The slot holds a token unique to this request, so release_slot() never frees a slot that
+    expired and was claimed again by another request.
+    """
+    lease = getattr(settings, 'API_CONCURRENCY_LEASE', 3600)
+    token = uuid.uuid4().hex
+    for slot in range(limit):
+        key = f'concurrency:{scope}:{slot}'
+        if cache.add(key, token, timeout=lease):
+            return key, token
+    return None
+
+
+def release_slot(key, token):
+    """Free a slot claimed by acquire_slot(), unless its lease ran out and someone else holds it.
+
+    The check and delete are two cache calls; with the lease above the worker timeout a
+    slot only expires under a dead worker, so nothing can claim it in between.
+    """
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+class ConcurrencyLimitMixin:
+    """Cap in-flight requests per action scope, using API_CONCURRENCY_LIMITS."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        scope = action_scope(self)
+        limit = getattr(settings, 'API_CONCURRENCY_LIMITS', {}).get(scope)
+        if not limit:
+            return
+        self._concurrency_slot = acquire_slot(scope, limit)
+        if self._concurrency_slot is None:
+            raise Throttled(
+                wait=getattr(settings, 'API_CONCURRENCY_RETRY_AFTER', 5),
+                detail='Too many requests of this kind are already running.',
+            )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        slot = getattr(self, '_concurrency_slot', None)
+        if slot:
+            release_slot(*slot)
+            self._concurrency_slot = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -1,3 +1,5 @@
+from collections import Counter
+from datetime import timedelta
 from rest_framework import viewsets, filters, status
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
@@ -5,28 +7,119 @@ from django.db.models import Count, Sum, Avg
 from django.utils.timezone import now
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.conf import settings
 from django.db import transaction
-from .models import Client, Project, AdditionalService, Employee, ProjectEmployee, Cost, PDFDocument
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from .models import Client, Project, AdditionalService, Employee, ProjectEmployee, Cost, PDFDocument, ChangeLog
 from .serializers import (
     ClientSerializer, ProjectSerializer, AdditionalServiceSerializer,
     EmployeeSerializer, ProjectEmployeeSerializer, CostSerializer,
-    PDFDocumentSerializer, CalendarEventSerializer
+    PDFDocumentSerializer, CalendarEventSerializer, ChangeLogSerializer
 )
-import pdfplumber
-import pandas as pd
-from datetime import datetime
+from .filters import ProjectFilter
+from . import changelog
+from .scheduling import employee_availability, find_conflicts
+from .analytics import DATE_RANGE, GRANULARITIES, MAX_WINDOW, cached_revenue_series
+from .ingestion import IMPORT_MODES, ImportFileError, plan_import, read_upload, run_import
+from .throttling import ConcurrencyLimitMixin
+from .density import CALENDAR_GRANULARITIES, calendar_density
+
+
+def is_dry_run(request):
+    return request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+
+
+def parse_date_param(value):
+    """Parse a YYYY-MM-DD query param: None if absent, False if malformed."""
+    if not value:
+        return None
+    try:
+        return parse_date(value) or False
+    except ValueError:
+        return False
+
+
+# --------------------------
+#  SPARSE FIELDSETS
+# --------------------------
+class SparseFieldsMixin:
+    """Honour `?fields=a,b,c` on list/retrieve: trim the serializer output and
+    load only those columns from the database. Unknown names are a 400."""
+    sparse_fields_actions = ('list', 'retrieve')
+
+    def get_requested_fields(self):
+        if getattr(self, 'action', None) not in self.sparse_fields_actions:
+            return None
+        raw = self.request.query_params.get('fields')
+        if not raw:
+            return None
+        requested = [name.strip() for name in raw.split(',') if name.strip()]
+        if not requested:
+            return None
+        available = self.get_serializer_class()().fields
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise ValidationError({
+                'fields': f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}"
+            })
+        return requested
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        requested = self.get_requested_fields()
+        if requested:
+            # Only push down when every requested name is a real column; computed
+            # fields (e.g. Cost.total_cost) need the full row anyway.
+            concrete_fields = {field.name for field in queryset.model._meta.concrete_fields}
+            if set(requested) <= concrete_fields:
+                queryset = queryset.only(*requested)
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        requested = self.get_requested_fields()
+        if requested:
+            context['fields'] = requested
+        return context
+
+
+# --------------------------
+#  CHANGE-LOGGED WRITES
+# --------------------------
+class AtomicWritesMixin:
+    """Run create/update/destroy in one transaction together with their change-log entries."""
+
+    def create(self, request, *args, **kwargs):
+        with transaction.atomic(), changelog.batched():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic(), changelog.batched():
+            return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic(), changelog.batched():
+            return super().destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        # Deletes are not signal-logged (that would disable fast deletes); log the row and its cascades
+        changelog.record_deletes(type(instance).objects.filter(pk=instance.pk))
+        instance.delete()
 
 
 # --------------------------
 #  PROJECT VIEWSET
 # --------------------------
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(AtomicWritesMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_class = ProjectFilter
     search_fields = ['client__name', 'client__email', 'address', 'job_type', 'description', 'building_type']
     ordering_fields = ['start_date', 'end_date', 'area_size_sqft', 'total_gain']
     ordering = ['-start_date']
+    throttle_scopes = {'summary': 'summary'}
 
     @action(detail=False, methods=['GET'])
     def summary(self, request):
@@ -78,11 +171,69 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
         return Response(data)
 
+    @action(detail=False, methods=['GET'])
+    def analytics(self, request):
+        """Monthly/weekly revenue, cost, margin and sqft series with rolling and YoY figures."""
+        granularity = request.query_params.get('granularity', 'month')
+        if granularity not in GRANULARITIES:
+            return Response({
+                'error': f"granularity must be one of: {', '.join(GRANULARITIES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        start = parse_date_param(request.query_params.get('start'))
+        end = parse_date_param(request.query_params.get('end'))
+        if start is False or end is False:
+            return Response({
+                'error': 'start and end must be dates (YYYY-MM-DD)'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if any(day and not DATE_RANGE[0] <= day <= DATE_RANGE[1] for day in (start, end)):
+            return Response({
+                'error': f'start and end must be between {DATE_RANGE[0]} and {DATE_RANGE[1]}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            window = int(request.query_params.get('window', 3))
+        except ValueError:
+            window = 0
+        if not 1 <= window <= MAX_WINDOW:
+            return Response({
+                'error': f'window must be an integer from 1 to {MAX_WINDOW}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Defaults to completed work, like the dashboard summary; ?status=all disables the filter
+        project_status = request.query_params.get('status', 'completed')
+        if project_status == 'all':
+            project_status = None
+
+        series = cached_revenue_series(granularity, start, end, window, project_status)
+        return Response({
+            'granularity': granularity,
+            'window': window,
+            'series': series,
+        })
+
     @action(detail=False, methods=['GET'])
     def calendar_events(self, request):
-        """Fetch calendar events for projects."""
+        """Fetch calendar events for projects.
+
+        With `granularity=day|week|month`, returns per-bucket counts instead, plus the
+        individual events only when the range holds at most CALENDAR_EVENTS_THRESHOLD projects.
+        """
+        granularity = request.query_params.get('granularity')
+        if granularity and granularity not in CALENDAR_GRANULARITIES:
+            return Response({
+                'error': f"granularity must be one of: {', '.join(CALENDAR_GRANULARITIES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
         start = request.query_params.get('start')
         end = request.query_params.get('end')
+        if granularity:
+            start = parse_date_param(start)
+            end = parse_date_param(end)
+            if start is False or end is False:
+                return Response({
+                    'error': 'start and end must be dates (YYYY-MM-DD)'
+                }, status=status.HTTP_400_BAD_REQUEST)
         queryset = self.get_queryset()
 
         if start:
@@ -90,46 +241,131 @@ class ProjectViewSet(viewsets.ModelViewSet):
         if end:
             queryset = queryset.filter(end_date__lte=end)
 
-        status = request.query_params.get('status')
-        if status:
-            queryset = queryset.filter(status=status)
-
-        serializer = CalendarEventSerializer(queryset, many=True)
-        return Response(serializer.data)
+        project_status = request.query_params.get('status')
+        if project_status:
+            queryset = queryset.filter(status=project_status)
+
+        events_queryset = queryset.select_related('client')
+        if not granularity:
+            serializer = CalendarEventSerializer(events_queryset, many=True)
+            return Response(serializer.data)
+
+        buckets = calendar_density(queryset, granularity)
+        total = sum(bucket['count'] for bucket in buckets)
+        threshold = getattr(settings, 'CALENDAR_EVENTS_THRESHOLD', 500)
+        events = None
+        if total <= threshold:
+            events = CalendarEventSerializer(events_queryset, many=True).data
+        return Response({
+            'granularity': granularity,
+            'total': total,
+            'buckets': buckets,
+            'events': events,
+        })
 
 
 # --------------------------
 #  OTHER VIEWSETS
 # --------------------------
-class CostViewSet(viewsets.ModelViewSet):
+class CostViewSet(AtomicWritesMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Cost.objects.all()
     serializer_class = CostSerializer
 
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(AtomicWritesMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Client.objects.all()
     serializer_class = ClientSerializer
 
 
-class AdditionalServiceViewSet(viewsets.ModelViewSet):
+class AdditionalServiceViewSet(AtomicWritesMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = AdditionalService.objects.all()
     serializer_class = AdditionalServiceSerializer
 
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(AtomicWritesMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
 
+    @action(detail=False, methods=['GET'])
+    def availability(self, request):
+        """Busy intervals and double bookings per employee for ?start=&end= (YYYY-MM-DD)."""
+        start = parse_date_param(request.query_params.get('start'))
+        end = parse_date_param(request.query_params.get('end'))
+        if not start or not end:
+            return Response({
+                'error': 'start and end dates (YYYY-MM-DD) are required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if end < start:
+            return Response({
+                'error': 'end must be on or after start'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-class ProjectEmployeeViewSet(viewsets.ModelViewSet):
+        employee_ids = request.query_params.get('employees')
+        if employee_ids:
+            try:
+                employee_ids = [int(pk) for pk in employee_ids.split(',') if pk.strip()]
+            except ValueError:
+                return Response({
+                    'error': 'employees must be a comma-separated list of ids'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'start': start,
+            'end': end,
+            'employees': employee_availability(start, end, employee_ids),
+        })
+
+
+class ProjectEmployeeViewSet(AtomicWritesMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = ProjectEmployee.objects.all()
     serializer_class = ProjectEmployeeSerializer
 
+    def check_schedule_conflicts(self, serializer):
+        """Reject assignments that double-book an employee across overlapping projects."""
+        instance = serializer.instance
+        employee = serializer.validated_data.get('employee', getattr(instance, 'employee', None))
+        project = serializer.validated_data.get('project', getattr(instance, 'project', None))
+        # Runs inside AtomicWritesMixin's transaction: locking the employee row serialises
+        # concurrent bookings of the same employee, so two requests can't both pass the check
+        Employee.objects.select_for_update().get(pk=employee.pk)
+        conflicts = find_conflicts(
+            employee.pk, project.start_date, project.end_date,
+            exclude_project_id=project.pk,
+            exclude_assignment_id=getattr(instance, 'pk', None),
+        )
+        if conflicts:
+            raise ValidationError({
+                'employee': [f'Employee is already assigned to overlapping project(s): {conflicts}']
+            })
+
+    def perform_create(self, serializer):
+        self.check_schedule_conflicts(serializer)
+        serializer.save()
 
-class PDFUploadViewSet(viewsets.ModelViewSet):
+    def perform_update(self, serializer):
+        # Only re-check when the booking itself moves, not on e.g. hours_worked edits
+        instance = serializer.instance
+        data = serializer.validated_data
+        if data.get('employee', instance.employee) != instance.employee or \
+                data.get('project', instance.project) != instance.project:
+            self.check_schedule_conflicts(serializer)
+        serializer.save()
+
+
+# --------------------------
+#  FILE IMPORT
+# --------------------------
+class PDFUploadViewSet(ConcurrencyLimitMixin, viewsets.ModelViewSet):
     queryset = PDFDocument.objects.all()
     serializer_class = PDFDocumentSerializer
     parser_classes = (MultiPartParser, FormParser)
+    throttle_scopes = {'create': 'imports'}
+
+    def get_throttle_scope(self):
+        # Dry runs write nothing: their own quota, and they don't take an import slot
+        if self.action == 'create' and is_dry_run(self.request):
+            return 'import_dry_runs'
+        return self.throttle_scopes.get(self.action)
 
     def create(self, request, *args, **kwargs):
         try:
@@ -143,193 +379,146 @@ class PDFUploadViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(data=request.data)
             if not serializer.is_valid():
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            # ?mode=upsert: update projects already imported under the same natural key
+            mode = request.query_params.get('mode', 'create')
+            if mode not in IMPORT_MODES:
+                return Response({
+                    'error': f"mode must be one of: {', '.join(IMPORT_MODES)}"
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            # ?dry_run=1: parse and validate the upload in memory, write nothing
+            if is_dry_run(request):
+                try:
+                    rows = read_upload(file, file.name)
+                    return Response(plan_import(rows, mode), status=status.HTTP_200_OK)
+                except ImportFileError as file_error:
+                    return Response({
+                        'error': str(file_error)
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                except Exception as processing_error:
+                    return Response({
+                        'error': f'Error processing file: {str(processing_error)}'
+                    }, status=status.HTTP_400_BAD_REQUEST)
             
             pdf_instance = serializer.save()
             
-            # Initialize lists for tracking processing results
-            processed_records = []
-            errors = []
-            
-            # Clean numeric values function
-            def clean_numeric(value):
-                if pd.isna(value):
-                    return 0.0
-                cleaned = ''.join(char for char in str(value) if char.isdigit() or char == '.')
-                try:
-                    return float(cleaned)
-                except ValueError:
-                    return 0.0
-            
             try:
-                # Process PDF file to extract data
-                if file.name.endswith('.pdf'):
-                    try:
-                        with pdfplumber.open(pdf_instance.file.path) as pdf:
-                            tables = []
-                            for page in pdf.pages:
-                                extracted_tables = page.extract_tables()
-                                if extracted_tables:
-                                    tables.extend(extracted_tables)
-                            
-                            if tables:
-                                headers = tables[0][0]
-                                data = tables[0][1:]
-                                df = pd.DataFrame(data, columns=headers)
-                            else:
-                                return Response({
-                                    'error': 'No tables found in PDF'
-                                }, status=status.HTTP_400_BAD_REQUEST)
-                    except Exception as pdf_error:
-                        return Response({
-                            'error': f'Error extracting data from PDF: {str(pdf_error)}'
-                        }, status=status.HTTP_400_BAD_REQUEST)
-                elif file.name.endswith('.csv'):
-                    # Process CSV
-                    df = pd.read_csv(pdf_instance.file.path)
-                else:
+                try:
+                    rows = read_upload(pdf_instance.file.path, file.name)
+                    processed_records, counts, errors = run_import(rows, mode)
+                except ImportFileError as file_error:
                     return Response({
-                        'error': 'File must be a PDF or CSV'
+                        'error': str(file_error)
                     }, status=status.HTTP_400_BAD_REQUEST)
                 
-                # Process DataFrame
-                if df is not None:
-                    # Clean column names
-                    df.columns = df.columns.str.strip()
-                    
-                    # Process each row
-                    for index, row in df.iterrows():
-                        try:
-                            # Clean phone number
-                            phone_number = str(row.get('Client Phone', '')).strip()
-                            phone_number = ' '.join(phone_number.split())
-                            
-                            # Create or get Client
-                            client, created = Client.objects.get_or_create(
-                                email=row.get('Email', ''),
-                                defaults={
-                                    'name': row.get('Email', '').split('@')[0],
-                                    'phone': phone_number
-                                }
-                            )
-                            
-                            # Create or get Employee
-                            employee_name = str(row.get('Employee Name', ''))
-                            employee_name_parts = employee_name.split()
-                            if len(employee_name_parts) >= 2:
-                                first_name = employee_name_parts[0]
-                                last_name = ' '.join(employee_name_parts[1:])
-                            else:
-                                first_name = employee_name
-                                last_name = ""
-                                
-                            employee, created = Employee.objects.get_or_create(
-                                first_name=first_name,
-                                last_name=last_name,
-                                defaults={
-                                    'wage': clean_numeric(row.get('Employee Wage', 0)),
-                                    'hours_worked': int(clean_numeric(row.get('Hours Worked', 0)))
-                                }
-                            )
-                            
-                            # Create Project
-                            project = Project.objects.create(
-                                client=client,
-                                building_type=row.get('Building Type', ''),
-                                address=row.get('Address', ''),
-                                job_type=row.get('Job Type', ''),
-                                description=f"Supplies Used: {row.get('Supplies Used', '')}",
-                                area_size_sqft=clean_numeric(row.get('Painting Area Size (sq ft)', 0)),
-                                start_date=datetime.strptime(str(row.get('Start Date', '')), '%Y-%m-%d').date(),
-                                end_date=datetime.strptime(str(row.get('End Date', '')), '%Y-%m-%d').date(),
-                                total_gain=clean_numeric(row.get('Total Gain', 0)),
-                                status='pending'
-                            )
-                            
-                            # Create Cost
-                            cost = Cost.objects.create(
-                                project=project,
-                                body_paint_cost=clean_numeric(row.get('Total Paint Cost (Body)', 0)),
-                                trim_paint_cost=clean_numeric(row.get('Total Paint Cost (Trim)', 0)),
-                                other_paint_cost=clean_numeric(row.get('Other Paint Cost', 0)),
-                                supplies_cost=clean_numeric(row.get('Cost of Supplies', 0)),
-                                additional_service_cost=clean_numeric(row.get('Additional Service Cost', 0))
-                            )
-                            
-                            # Create Additional Service
-                            service_name = row.get('Additional Services', '')
-                            if pd.notna(service_name) and service_name:
-                                service = AdditionalService.objects.create(
-                                    project=project,
-                                    service_name=str(service_name),
-                                    service_cost=clean_numeric(row.get('Additional Service Cost', 0))
-                                )
-                                
-                            # Create Project Employee Relationship
-                            project_employee = ProjectEmployee.objects.create(
-                                project=project,
-                                employee=employee,
-                                hours_worked=int(clean_numeric(row.get('Hours Worked', 0)))
-                            )
-                            
-                            processed_records.append({
-                                'project_id': project.project_id,
-                                'client_email': client.email,
-                                'date_created': row.get('Date Created', '')
-                            })
-                            
-                        except Exception as row_error:
-                            errors.append({
-                                'row': index + 1,
-                                'error': str(row_error)
-                            })
-                    
-                    # Mark PDF as processed
-                    pdf_instance.processed = True
-                    pdf_instance.save()
-                    
-                    response_data = {
-                        'message': 'File processed successfully',
-                        'processed_records': processed_records,
-                        'total_records': len(df),
-                        'successful_records': len(processed_records),
-                        'failed_records': len(errors)
-                    }
-                    
-                    if errors:
-                        response_data['errors'] = errors
-                        return Response(response_data, status=status.HTTP_207_MULTI_STATUS)
-                    
-                    return Response(response_data, status=status.HTTP_201_CREATED)
+                # Mark PDF as processed
+                pdf_instance.processed = True
+                pdf_instance.save()
+                
+                successful_records = sum(counts.values())
+                response_data = {
+                    'message': 'File processed successfully',
+                    # Capped at PROCESSED_RECORDS_LIMIT rows; the counts cover the whole file
+                    'processed_records': processed_records,
+                    'processed_records_truncated': len(processed_records) < successful_records,
+                    'total_records': successful_records + len(errors),
+                    'successful_records': successful_records,
+                    'failed_records': len(errors)
+                }
+                if mode == 'upsert':
+                    response_data['mode'] = mode
+                    for outcome in ('created', 'updated', 'unchanged'):
+                        response_data[outcome] = counts[outcome]
+                
+                if errors:
+                    response_data['errors'] = errors
+                    return Response(response_data, status=status.HTTP_207_MULTI_STATUS)
+                
+                return Response(response_data, status=status.HTTP_201_CREATED)
                 
             except Exception as processing_error:
                 return Response({
                     'error': f'Error processing file: {str(processing_error)}'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-            
         except Exception as e:
             return Response({
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# --------------------------
+#  CHANGE FEED
+# --------------------------
+class ChangeLogViewSet(viewsets.GenericViewSet):
+    """Cursor-paginated change feed: GET changes/?after=<id>&limit=&model=.
+
+    Ids are assigned at insert but become visible at commit, so a transaction
+    still open when a later id is served would have its entries skipped by a
+    client resuming from next_after. The feed therefore stops at the first
+    entry younger than CHANGES_SETTLE_SECONDS: a client that pages with
+    next_after sees every entry, provided no transaction holds its change-log
+    inserts open longer than that window.
+    """
+    queryset = ChangeLog.objects.all()
+    serializer_class = ChangeLogSerializer
+    default_limit = 1000
+    max_limit = 10000
+
+    def list(self, request):
+        try:
+            after = int(request.query_params.get('after', 0))
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            return Response({
+                'error': 'after and limit must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({
+                'error': 'limit must be positive'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Primary-key range scan: cost depends on the page size, not the table size
+        queryset = ChangeLog.objects.filter(id__gt=after).order_by('id')
+        model = request.query_params.get('model')
+        if model:
+            queryset = queryset.filter(model=model)
+
+        entries = list(queryset[:limit + 1])
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        # Entries that may still have uncommitted predecessors wait for a later poll
+        settled_before = now() - timedelta(seconds=getattr(settings, 'CHANGES_SETTLE_SECONDS', 10))
+        for position, entry in enumerate(entries):
+            if entry.created_at >= settled_before:
+                entries, has_more = entries[:position], False
+                break
+
+        return Response({
+            'results': self.get_serializer(entries, many=True).data,
+            'next_after': entries[-1].id if entries else after,
+            'has_more': has_more,
+        })
+
+
 # --------------------------
 #  DATA MANAGEMENT VIEWSET
 # --------------------------
-class DataManagementViewSet(viewsets.ViewSet):
+class DataManagementViewSet(ConcurrencyLimitMixin, viewsets.ViewSet):
+    throttle_scopes = {'clear_all_data': 'data_management'}
+
     @action(detail=False, methods=['DELETE'])
     def clear_all_data(self, request):
         """Delete all data in the database."""
         try:
-            with transaction.atomic():
-                PDFDocument.objects.all().delete()
-                ProjectEmployee.objects.all().delete()
-                AdditionalService.objects.all().delete()
-                Cost.objects.all().delete()
-                Project.objects.all().delete()
-                Employee.objects.all().delete()
-                Client.objects.all().delete()
+            with transaction.atomic(), changelog.batched():
+                deleted = Counter()
+                for model in (PDFDocument, ProjectEmployee, AdditionalService, Cost, Project, Employee, Client):
+                    deleted.update(model.objects.all().delete()[1])
+                # One entry per emptied table rather than one per row
+                changelog.record_truncates(deleted)
 
                 return Response({"message": "All data has been successfully deleted"}, status=status.HTTP_200_OK)
 
@@ -151,8 +151,44 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.JSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
-    ]
+    ],
+    # orjson-backed JSON renderer, falls back to the stock encoder if orjson is missing
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # Views map expensive actions to these scopes via `throttle_scopes`; other actions are not throttled
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.ActionScopedRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'summary': '120/min',
+        'imports': '10/hour',
+        'import_dry_runs': '60/hour',
+        'data_management': '5/hour',
+    },
+}
+
+# Max requests in flight per throttle scope (needs a shared cache to apply across workers)
+API_CONCURRENCY_LIMITS = {
+    'imports': 2,
+    'data_management': 1,
 }
+# Seconds before a slot held by a crashed worker is released; keep it above the
+# worker timeout (e.g. gunicorn --timeout) so a slow request never outlives its slot
+API_CONCURRENCY_LEASE = 3600
+# Retry-After sent when a scope is at its concurrency limit
+API_CONCURRENCY_RETRY_AFTER = 5
+
+# Seconds to cache /api/projects/analytics/ results per parameter set
+ANALYTICS_CACHE_TIMEOUT = 300
+
+# /api/changes/ only serves entries older than this many seconds, so transactions
+# that commit late are not skipped; keep it above the longest writing transaction
+CHANGES_SETTLE_SECONDS = 10
+
+# calendar_events?granularity=... only includes individual events up to this many projects
+CALENDAR_EVENTS_THRESHOLD = 500
 
 # Add CORS settings
 CORS_ALLOWED_ORIGINS = [